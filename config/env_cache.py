@@ -0,0 +1,47 @@
+# config/env_cache.py
+"""
+Lectura compartida del fichero .env para todas las clases de configuración
+"""
+
+from typing import Dict, Mapping, Optional, Tuple
+from pydantic_settings import DotEnvSettingsSource
+
+
+# Fichero .env común a los módulos de configuración
+ENV_FILE = ".env"
+ENV_FILE_ENCODING = "utf-8"
+
+# Contenido ya parseado del .env, por (fichero, codificación, case_sensitive)
+_dotenv_cache: Dict[Tuple[str, Optional[str], bool], Mapping[str, Optional[str]]] = {}
+
+
+class CachedDotEnvSettingsSource(DotEnvSettingsSource):
+    """
+    DotEnvSettingsSource que parsea el .env una sola vez por proceso y
+    reutiliza el resultado en todas las clases de configuración
+    """
+    
+    def _load_env_vars(self) -> Mapping[str, Optional[str]]:
+        key = (str(self.env_file), self.env_file_encoding, bool(self.case_sensitive))
+        
+        if key not in _dotenv_cache:
+            _dotenv_cache[key] = super()._load_env_vars()
+        
+        return _dotenv_cache[key]
+
+
+def dotenv_source(settings_cls) -> CachedDotEnvSettingsSource:
+    """
+    Crea la fuente .env cacheada para una clase de configuración
+    
+    Args:
+        settings_cls: Clase BaseSettings que la utilizará
+        
+    Returns:
+        Fuente de configuración
+    """
+    return CachedDotEnvSettingsSource(
+        settings_cls,
+        env_file=ENV_FILE,
+        env_file_encoding=ENV_FILE_ENCODING
+    )
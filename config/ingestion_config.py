@@ -4,10 +4,14 @@ Configuración para el Módulo 1: Data Ingestion Pipeline
 VERSIÓN CORREGIDA - Compatible con .env
 """
 
-from pydantic_settings import BaseSettings, SettingsConfigDict
+from pydantic import ValidationError, model_validator
+from pydantic_settings import BaseSettings, SettingsConfigDict, PydanticBaseSettingsSource
 from typing import List, Optional, Dict, Any
 from pathlib import Path
-import json
+from functools import lru_cache, cached_property
+
+from config.env_cache import dotenv_source
+from config.parsing import json_adapter, parse_str_list
 
 
 class IngestionConfig(BaseSettings):
@@ -21,7 +25,7 @@ class IngestionConfig(BaseSettings):
     MARKDOWN_OUTPUT_DIR: str = "data/processed/markdown"
     IMAGES_DIR: str = "data/images"
     
-    # Document Loader - FORMATO STRING, parseamos manualmente
+    # Document Loader - FORMATO STRING: lista JSON o separada por comas
     SUPPORTED_FORMATS_STR: str = ".pdf,.txt,.md,.docx,.doc,.csv,.json,.html,.xml"
     RECURSIVE_LOAD: bool = True
     EXCLUDE_HIDDEN: bool = True
@@ -50,7 +54,7 @@ class IngestionConfig(BaseSettings):
     STOP_ON_VALIDATION_ERROR: bool = False
     
     # Document Store
-    DOCSTORE_BACKEND: str = "simple"
+    DOCSTORE_BACKEND: str = "simple"  # simple, sqlite, mongodb, redis, json
     DOCSTORE_PATH: str = "data/docstore"
     
     # MongoDB (opcional)
@@ -88,58 +92,151 @@ class IngestionConfig(BaseSettings):
     ENABLE_DETAILED_METRICS: bool = False
     
     model_config = SettingsConfigDict(
-        env_file=".env",
-        env_file_encoding="utf-8",
+        # El .env se lee mediante dotenv_source (cacheado, ver settings_customise_sources)
         env_prefix="INGESTION_",
         case_sensitive=True,
-        extra="ignore"  # Ignorar campos extra del .env
+        extra="ignore",  # Ignorar campos extra del .env
+        frozen=True  # Inmutable: permite cachear valores derivados con seguridad
     )
     
+    @classmethod
+    def settings_customise_sources(
+        cls,
+        settings_cls,
+        init_settings: PydanticBaseSettingsSource,
+        env_settings: PydanticBaseSettingsSource,
+        dotenv_settings: PydanticBaseSettingsSource,
+        file_secret_settings: PydanticBaseSettingsSource,
+    ):
+        """Misma prioridad que por defecto, pero con el .env parseado una sola vez"""
+        return init_settings, env_settings, dotenv_source(settings_cls), file_secret_settings
+    
     # Propiedades computadas para parsear strings a listas/dicts
-    @property
+    # (cacheadas: la configuración no cambia una vez cargada)
+    @cached_property
     def SUPPORTED_FORMATS(self) -> List[str]:
         """Parsea SUPPORTED_FORMATS_STR a lista"""
-        return [fmt.strip() for fmt in self.SUPPORTED_FORMATS_STR.split(",")]
+        return parse_str_list(self.SUPPORTED_FORMATS_STR)
     
-    @property
+    @cached_property
     def REQUIRED_METADATA_FIELDS(self) -> List[str]:
         """Parsea REQUIRED_METADATA_FIELDS_STR a lista"""
-        return [field.strip() for field in self.REQUIRED_METADATA_FIELDS_STR.split(",")]
+        return parse_str_list(self.REQUIRED_METADATA_FIELDS_STR)
     
-    @property
+    @cached_property
     def CUSTOM_METADATA_FIELDS(self) -> Dict[str, Any]:
         """Parsea CUSTOM_METADATA_FIELDS_JSON a diccionario"""
         try:
-            return json.loads(self.CUSTOM_METADATA_FIELDS_JSON)
-        except json.JSONDecodeError:
+            return json_adapter(Dict[str, Any]).validate_json(self.CUSTOM_METADATA_FIELDS_JSON)
+        except ValidationError:
             return {}
     
-    @property
+    @cached_property
     def ALLOWED_FILE_EXTENSIONS(self) -> List[str]:
         """Parsea ALLOWED_FILE_EXTENSIONS_STR a lista"""
         if not self.ALLOWED_FILE_EXTENSIONS_STR:
             return self.SUPPORTED_FORMATS
-        return [ext.strip() for ext in self.ALLOWED_FILE_EXTENSIONS_STR.split(",")]
+        return parse_str_list(self.ALLOWED_FILE_EXTENSIONS_STR)
+    
+    # Rutas como Path (inmutables, se construyen una sola vez)
+    @cached_property
+    def raw_data_path(self) -> Path:
+        return Path(self.RAW_DATA_DIR)
+    
+    @cached_property
+    def processed_data_path(self) -> Path:
+        return Path(self.PROCESSED_DATA_DIR)
+    
+    @cached_property
+    def markdown_output_path(self) -> Path:
+        return Path(self.MARKDOWN_OUTPUT_DIR)
+    
+    @cached_property
+    def images_path(self) -> Path:
+        return Path(self.IMAGES_DIR)
+    
+    @cached_property
+    def log_file_path(self) -> Optional[Path]:
+        return Path(self.LOG_FILE) if self.LOG_FILE else None
+    
+    @cached_property
+    def log_dir_path(self) -> Optional[Path]:
+        return self.log_file_path.parent if self.log_file_path else None
+    
+    @model_validator(mode='after')
+    def _validate_config(self) -> "IngestionConfig":
+        """Valida que la configuración sea correcta (una vez, al construirla)"""
+        errors = []
+        
+        # Validar directorios
+        if not self.RAW_DATA_DIR:
+            errors.append("RAW_DATA_DIR no puede estar vacío")
+        
+        # Validar rangos
+        if self.MIN_TEXT_LENGTH < 0:
+            errors.append("MIN_TEXT_LENGTH debe ser >= 0")
+        
+        if self.MAX_TEXT_LENGTH < self.MIN_TEXT_LENGTH:
+            errors.append("MAX_TEXT_LENGTH debe ser >= MIN_TEXT_LENGTH")
+        
+        if self.BATCH_SIZE < 1:
+            errors.append("BATCH_SIZE debe ser >= 1")
+        
+        if self.MAX_WORKERS < 1:
+            errors.append("MAX_WORKERS debe ser >= 1")
+        
+        # Validar formatos
+        if not any(self.SUPPORTED_FORMATS):
+            errors.append("SUPPORTED_FORMATS no puede estar vacío")
+        
+        if errors:
+            raise ValueError(f"Errores de configuración:\n" + "\n".join(f"  - {e}" for e in errors))
+        
+        return self
+
+
+# Instancia global de configuración (se construye en el primer acceso)
+_config_instance: Optional[IngestionConfig] = None
 
 
-# Instancia global de configuración
-config = IngestionConfig()
+def get_global_config() -> IngestionConfig:
+    """
+    Obtiene la instancia global de configuración, creándola la primera vez
+    que se solicita (la validación se hace al construirla)
+    
+    Returns:
+        Instancia global de configuración
+    """
+    global _config_instance
+    
+    if _config_instance is None:
+        _config_instance = IngestionConfig()
+    
+    return _config_instance
+
+
+# Directorios ya creados en este proceso (evita repetir mkdir en llamadas posteriores)
+_created_dirs: set = set()
 
 
 # Funciones helper
 def setup_directories():
     """Crea los directorios necesarios para la ingestión"""
-    directories = [
-        config.RAW_DATA_DIR,
-        config.PROCESSED_DATA_DIR,
-        config.MARKDOWN_OUTPUT_DIR,
-        config.IMAGES_DIR,
-        Path(config.LOG_FILE).parent if config.LOG_FILE else None
-    ]
+    config = get_global_config()
+    directories = {
+        directory for directory in (
+            config.raw_data_path,
+            config.processed_data_path,
+            config.markdown_output_path,
+            config.images_path,
+            config.log_dir_path
+        ) if directory
+    } - _created_dirs
     
     for directory in directories:
-        if directory:
-            Path(directory).mkdir(parents=True, exist_ok=True)
+        directory.mkdir(parents=True, exist_ok=True)
+    
+    _created_dirs.update(directories)
     
     print("✓ Directorios creados correctamente")
 
@@ -177,6 +274,14 @@ class TestingConfig(IngestionConfig):
     IMAGES_DIR: str = "tests/fixtures/images"
 
 
+# Clase de configuración por entorno (solo se instancia la solicitada)
+_ENVIRONMENT_CONFIGS = {
+    'development': DevelopmentConfig,
+    'testing': TestingConfig,
+    'production': ProductionConfig,
+}
+
+
 def get_config(environment: str = "development") -> IngestionConfig:
     """
     Obtiene la configuración según el entorno
@@ -187,49 +292,19 @@ def get_config(environment: str = "development") -> IngestionConfig:
     Returns:
         Instancia de configuración
     """
-    configs = {
-        'development': DevelopmentConfig(),
-        'testing': TestingConfig(),
-        'production': ProductionConfig(),
-    }
-    
-    return configs.get(environment.lower(), IngestionConfig())
+    return _get_config_cached(environment.lower())
 
 
-# Función de validación
-def validate_config():
-    """Valida que la configuración sea correcta"""
-    errors = []
-    
-    # Validar directorios
-    if not config.RAW_DATA_DIR:
-        errors.append("RAW_DATA_DIR no puede estar vacío")
-    
-    # Validar rangos
-    if config.MIN_TEXT_LENGTH < 0:
-        errors.append("MIN_TEXT_LENGTH debe ser >= 0")
-    
-    if config.MAX_TEXT_LENGTH < config.MIN_TEXT_LENGTH:
-        errors.append("MAX_TEXT_LENGTH debe ser >= MIN_TEXT_LENGTH")
-    
-    if config.BATCH_SIZE < 1:
-        errors.append("BATCH_SIZE debe ser >= 1")
-    
-    if config.MAX_WORKERS < 1:
-        errors.append("MAX_WORKERS debe ser >= 1")
-    
-    # Validar formatos
-    if not config.SUPPORTED_FORMATS:
-        errors.append("SUPPORTED_FORMATS no puede estar vacío")
-    
-    if errors:
-        raise ValueError(f"Errores de configuración:\n" + "\n".join(f"  - {e}" for e in errors))
+@lru_cache(maxsize=None)
+def _get_config_cached(environment: str) -> IngestionConfig:
+    """Construye (una sola vez por entorno) la configuración solicitada"""
+    config_cls = _ENVIRONMENT_CONFIGS.get(environment, IngestionConfig)
     
-    return True
+    return config_cls()
 
 
-# Validar al cargar
-try:
-    validate_config()
-except ValueError as e:
-    print(f"⚠️  ADVERTENCIA: {e}")
\ No newline at end of file
+def __getattr__(name: str):
+    """Acceso perezoso a `config` (PEP 562) para mantener `from ... import config`"""
+    if name == "config":
+        return get_global_config()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,43 @@
+# config/parsing.py
+"""
+Parseo de valores del entorno compartido por todas las clases de configuración
+"""
+
+from typing import Any, List
+from functools import lru_cache
+from pydantic import TypeAdapter, ValidationError
+
+
+@lru_cache(maxsize=None)
+def json_adapter(tp: Any) -> TypeAdapter:
+    """
+    Parser JSON de pydantic-core (Rust) para el tipo indicado, construido
+    solo la primera vez que se necesita (no en el import del módulo)
+    """
+    return TypeAdapter(tp)
+
+
+# Tabla de str.translate para eliminar espacios en blanco
+_WHITESPACE_TABLE = str.maketrans("", "", " \t\r\n")
+
+
+def parse_str_list(raw: str) -> List[str]:
+    """
+    Parsea una lista de strings en formato JSON ('[".pdf", ".txt"]')
+    o, por compatibilidad, separada por comas ('.pdf,.txt')
+    
+    Args:
+        raw: Valor tal como viene del entorno
+        
+    Returns:
+        Lista de strings sin espacios
+    """
+    raw = raw.strip()
+    if raw.startswith("["):
+        try:
+            return [item.strip() for item in json_adapter(List[str]).validate_json(raw)]
+        except ValidationError:
+            pass
+    # Los valores son extensiones/nombres de campo sin espacios internos:
+    # se eliminan todos los espacios de una pasada y se parte una sola vez
+    return raw.translate(_WHITESPACE_TABLE).split(",")
@@ -3,9 +3,14 @@
 Configuración para el Módulo 2: Document Processing & Indexing
 """
 
-from pydantic_settings import BaseSettings, SettingsConfigDict
+from pydantic import model_validator
+from pydantic_settings import BaseSettings, SettingsConfigDict, PydanticBaseSettingsSource
 from typing import Optional, List
 from pathlib import Path
+from functools import lru_cache, cached_property
+
+from config.env_cache import dotenv_source
+from config.parsing import parse_str_list
 
 
 class ProcessingConfig(BaseSettings):
@@ -31,12 +36,12 @@ class ProcessingConfig(BaseSettings):
     # EMBEDDINGS
     # =================================================================
     # Modelo: openai-small, openai-large, bge-large, bge-m3, e5-multilingual, etc.
-    # EMBEDDING_MODEL: str = "openai-small"
-    # EMBEDDING_BATCH_SIZE: int = 100
-    # EMBEDDING_DIMENSIONS: int = 1536  # Se ajusta automáticamente según modelo
+    EMBEDDING_MODEL: str = "bge-m3"
+    EMBEDDING_BATCH_SIZE: int = 100
+    EMBEDDING_DIMENSIONS: int = 1024  # Debe coincidir con el modelo (openai-small: 1536)
     
     # OpenAI
-    # OPENAI_API_KEY: Optional[str] = None
+    OPENAI_API_KEY: Optional[str] = None
     
     # HuggingFace (para modelos locales)
     HF_TOKEN: Optional[str] = None
@@ -45,7 +50,7 @@ class ProcessingConfig(BaseSettings):
     # =================================================================
     # VECTOR STORE
     # =================================================================
-    VECTOR_STORE_BACKEND: str = "qdrant"  # qdrant, chroma, pinecone, faiss
+    VECTOR_STORE_BACKEND: str = "qdrant"  # qdrant, chroma, pinecone, faiss, faiss-ivfpq, faiss-sq8
     VECTOR_STORE_PATH: str = "data/vector_stores"
     COLLECTION_NAME: str = "rag_documents"
     
@@ -109,21 +114,34 @@ class ProcessingConfig(BaseSettings):
     DEBUG: bool = True
     
     model_config = SettingsConfigDict(
-        env_file=".env",
-        env_file_encoding="utf-8",
+        # El .env se lee mediante dotenv_source (cacheado, ver settings_customise_sources)
         env_prefix="PROCESSING_",
         case_sensitive=True,
-        extra="ignore"
+        extra="ignore",
+        frozen=True  # Inmutable: permite cachear valores derivados con seguridad
     )
     
-    # Propiedades computadas
-    @property
+    @classmethod
+    def settings_customise_sources(
+        cls,
+        settings_cls,
+        init_settings: PydanticBaseSettingsSource,
+        env_settings: PydanticBaseSettingsSource,
+        dotenv_settings: PydanticBaseSettingsSource,
+        file_secret_settings: PydanticBaseSettingsSource,
+    ):
+        """Misma prioridad que por defecto, pero con el .env parseado una sola vez"""
+        return init_settings, env_settings, dotenv_source(settings_cls), file_secret_settings
+    
+    # Propiedades computadas (cacheadas: la configuración no cambia una vez cargada)
+    @cached_property
     def METADATA_FIELDS_LIST(self) -> List[str]:
         """Parsea METADATA_FIELDS_TO_INDEX a lista"""
-        return [field.strip() for field in self.METADATA_FIELDS_TO_INDEX.split(",")]
+        return parse_str_list(self.METADATA_FIELDS_TO_INDEX)
     
-    def get_vector_store_config(self) -> dict:
-        """Obtiene configuración del vector store"""
+    @cached_property
+    def vector_store_config(self) -> dict:
+        """Configuración del vector store (compartida: no modificar)"""
         if self.VECTOR_STORE_BACKEND == "qdrant":
             config = {
                 'backend': 'qdrant',
@@ -160,8 +178,9 @@ class ProcessingConfig(BaseSettings):
                 'dimension': self.EMBEDDING_DIMENSIONS
             }
     
-    def get_embedding_config(self) -> dict:
-        """Obtiene configuración de embeddings"""
+    @cached_property
+    def embedding_config(self) -> dict:
+        """Configuración de embeddings (compartida: no modificar)"""
         config = {
             'model_name': self.EMBEDDING_MODEL,
             'batch_size': self.EMBEDDING_BATCH_SIZE
@@ -172,8 +191,9 @@ class ProcessingConfig(BaseSettings):
         
         return config
     
-    def get_chunking_config(self) -> dict:
-        """Obtiene configuración de chunking"""
+    @cached_property
+    def chunking_config(self) -> dict:
+        """Configuración de chunking (compartida: no modificar)"""
         return {
             'strategy': self.CHUNKING_STRATEGY,
             'chunk_size': self.CHUNK_SIZE,
@@ -182,25 +202,109 @@ class ProcessingConfig(BaseSettings):
             'threshold': self.SEMANTIC_THRESHOLD,
             'window_size': self.SENTENCE_WINDOW_SIZE
         }
+    
+    def get_vector_store_config(self) -> dict:
+        """Obtiene configuración del vector store"""
+        return self.vector_store_config
+    
+    def get_embedding_config(self) -> dict:
+        """Obtiene configuración de embeddings"""
+        return self.embedding_config
+    
+    def get_chunking_config(self) -> dict:
+        """Obtiene configuración de chunking"""
+        return self.chunking_config
+    
+    # Rutas como Path (inmutables, se construyen una sola vez)
+    @cached_property
+    def vector_store_path(self) -> Path:
+        return Path(self.VECTOR_STORE_PATH)
+    
+    @cached_property
+    def index_persist_path(self) -> Path:
+        return Path(self.INDEX_PERSIST_DIR)
+    
+    @cached_property
+    def metadata_index_path(self) -> Path:
+        return Path(self.METADATA_INDEX_PATH)
+    
+    @cached_property
+    def hf_cache_path(self) -> Path:
+        return Path(self.HF_CACHE_DIR)
+    
+    @cached_property
+    def log_dir_path(self) -> Path:
+        return Path(self.LOG_FILE).parent
+    
+    @model_validator(mode='after')
+    def _validate_config(self) -> "ProcessingConfig":
+        """Valida la configuración (una vez, al construirla)"""
+        errors = []
+        
+        # Validar chunking
+        if self.CHUNK_SIZE < 50:
+            errors.append("CHUNK_SIZE debe ser >= 50")
+        
+        if self.CHUNK_OVERLAP >= self.CHUNK_SIZE:
+            errors.append("CHUNK_OVERLAP debe ser < CHUNK_SIZE")
+        
+        # Validar embeddings
+        if 'openai' in self.EMBEDDING_MODEL and not self.OPENAI_API_KEY:
+            errors.append("OPENAI_API_KEY requerida para modelos OpenAI")
+        
+        if self.VECTOR_STORE_BACKEND == 'pinecone' and not self.PINECONE_API_KEY:
+            errors.append("PINECONE_API_KEY requerida para Pinecone")
+        
+        # Validar similarity
+        if self.SIMILARITY_TOP_K < 1:
+            errors.append("SIMILARITY_TOP_K debe ser >= 1")
+        
+        if errors:
+            raise ValueError(f"Errores de configuración:\n" + "\n".join(f"  - {e}" for e in errors))
+        
+        return self
+
+
+# Instancia global (se construye en el primer acceso)
+_config_instance: Optional[ProcessingConfig] = None
+
+
+def get_global_config() -> ProcessingConfig:
+    """
+    Obtiene la instancia global, creándola en el primer acceso
+    (la validación se hace al construirla)
+    
+    Returns:
+        Instancia global de configuración
+    """
+    global _config_instance
+    
+    if _config_instance is None:
+        _config_instance = ProcessingConfig()
+    
+    return _config_instance
 
 
-# Instancia global
-config = ProcessingConfig()
+# Directorios ya creados en este proceso (evita repetir mkdir en llamadas posteriores)
+_created_dirs: set = set()
 
 
 # Funciones helper
 def setup_directories():
     """Crea los directorios necesarios"""
-    directories = [
-        config.VECTOR_STORE_PATH,
-        config.INDEX_PERSIST_DIR,
-        config.METADATA_INDEX_PATH,
-        config.HF_CACHE_DIR,
-        Path(config.LOG_FILE).parent
-    ]
+    config = get_global_config()
+    directories = {
+        config.vector_store_path,
+        config.index_persist_path,
+        config.metadata_index_path,
+        config.hf_cache_path,
+        config.log_dir_path
+    } - _created_dirs
     
     for directory in directories:
-        Path(directory).mkdir(parents=True, exist_ok=True)
+        directory.mkdir(parents=True, exist_ok=True)
+    
+    _created_dirs.update(directories)
     
     print("✓ Directorios del Módulo 2 creados")
 
@@ -235,6 +339,14 @@ class TestingConfig(ProcessingConfig):
     INDEX_PERSIST_DIR: str = "tests/fixtures/indexes"
 
 
+# Clase de configuración por entorno (solo se instancia la solicitada)
+_ENVIRONMENT_CONFIGS = {
+    'development': DevelopmentConfig,
+    'testing': TestingConfig,
+    'production': ProductionConfig,
+}
+
+
 def get_config(environment: str = "development") -> ProcessingConfig:
     """
     Obtiene configuración según entorno
@@ -245,45 +357,19 @@ def get_config(environment: str = "development") -> ProcessingConfig:
     Returns:
         Configuración
     """
-    configs = {
-        'development': DevelopmentConfig(),
-        'testing': TestingConfig(),
-        'production': ProductionConfig()
-    }
-    
-    return configs.get(environment.lower(), ProcessingConfig())
+    return _get_config_cached(environment.lower())
 
 
-def validate_config():
-    """Valida la configuración"""
-    errors = []
-    
-    # Validar chunking
-    if config.CHUNK_SIZE < 50:
-        errors.append("CHUNK_SIZE debe ser >= 50")
-    
-    if config.CHUNK_OVERLAP >= config.CHUNK_SIZE:
-        errors.append("CHUNK_OVERLAP debe ser < CHUNK_SIZE")
-    
-    # Validar embeddings
-    if 'openai' in config.EMBEDDING_MODEL and not config.OPENAI_API_KEY:
-        errors.append("OPENAI_API_KEY requerida para modelos OpenAI")
-    
-    if config.VECTOR_STORE_BACKEND == 'pinecone' and not config.PINECONE_API_KEY:
-        errors.append("PINECONE_API_KEY requerida para Pinecone")
-    
-    # Validar similarity
-    if config.SIMILARITY_TOP_K < 1:
-        errors.append("SIMILARITY_TOP_K debe ser >= 1")
-    
-    if errors:
-        raise ValueError(f"Errores de configuración:\n" + "\n".join(f"  - {e}" for e in errors))
+@lru_cache(maxsize=None)
+def _get_config_cached(environment: str) -> ProcessingConfig:
+    """Construye (una sola vez por entorno) la configuración solicitada"""
+    config_cls = _ENVIRONMENT_CONFIGS.get(environment, ProcessingConfig)
     
-    return True
+    return config_cls()
 
 
-# Validar al cargar
-try:
-    validate_config()
-except ValueError as e:
-    print(f"⚠️  ADVERTENCIA: {e}")
+def __getattr__(name: str):
+    """Acceso perezoso a `config` (PEP 562) para mantener `from ... import config`"""
+    if name == "config":
+        return get_global_config()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
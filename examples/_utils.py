@@ -0,0 +1,27 @@
+# examples/_utils.py
+"""
+Utilitats compartides pels exemples
+"""
+
+from pathlib import Path
+from typing import Set, Union
+
+# Directoris ja creats en aquesta execució (evita stat/mkdir repetits)
+_ensured: Set[str] = set()
+
+
+def ensure_dir(path: Union[str, Path]) -> Path:
+    """
+    Crea el directori (i els pares) només el primer cop que es demana
+
+    Args:
+        path: Directori a crear
+
+    Returns:
+        Path del directori
+    """
+    key = str(path)
+    if key not in _ensured:
+        Path(key).mkdir(parents=True, exist_ok=True)
+        _ensured.add(key)
+    return Path(key)
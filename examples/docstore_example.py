@@ -12,6 +12,7 @@ sys.path.insert(0, str(ROOT))
 
 from modules.ingestion.docstore import (
     DocumentStoreManager,
+    get_docstore,
     process_and_store_documents
 )
 from modules.ingestion import (
@@ -19,6 +20,7 @@ from modules.ingestion import (
     TextCleaner,
     MetadataExtractor
 )
+from examples._utils import ensure_dir
 from llama_index.core import Document
 import logging
 
@@ -34,8 +36,8 @@ def example_1_basic_persistence():
     print("EXEMPLE 1: Persistència bàsica")
     print("="*70 + "\n")
     
-    # Crear docstore
-    docstore = DocumentStoreManager(
+    # Crear docstore (compartit entre exemples)
+    docstore = get_docstore(
         backend='simple',
         persist_path='data/docstore'
     )
@@ -81,11 +83,10 @@ def example_2_complete_pipeline():
     print("="*70 + "\n")
     
     # Crear directoris
-    pdf_dir = Path("data/raw/pdfs")
-    pdf_dir.mkdir(parents=True, exist_ok=True)
+    pdf_dir = ensure_dir("data/raw/pdfs")
     
     # Inicialitzar docstore
-    docstore = DocumentStoreManager(
+    docstore = get_docstore(
         backend='simple',
         persist_path='data/docstore'
     )
@@ -99,6 +100,7 @@ def example_2_complete_pipeline():
     )
     
     print(f"\n✓ Documents processats: {results['processed']}")
+    print(f"✓ Sense canvis (saltats): {results['unchanged']}")
     print(f"✓ Guardats: {results['store_results']}")
     
     if results['errors']:
@@ -115,7 +117,7 @@ def example_3_search_by_metadata():
     print("EXEMPLE 3: Cerca per metadades")
     print("="*70 + "\n")
     
-    docstore = DocumentStoreManager(
+    docstore = get_docstore(
         backend='simple',
         persist_path='data/docstore'
     )
@@ -180,7 +182,7 @@ def example_4_incremental_updates():
     print("EXEMPLE 4: Actualitzacions incrementals")
     print("="*70 + "\n")
     
-    docstore = DocumentStoreManager(
+    docstore = get_docstore(
         backend='simple',
         persist_path='data/docstore'
     )
@@ -228,7 +230,7 @@ def example_5_delete_and_cleanup():
     print("EXEMPLE 5: Esborrar documents")
     print("="*70 + "\n")
     
-    docstore = DocumentStoreManager(
+    docstore = get_docstore(
         backend='simple',
         persist_path='data/docstore'
     )
@@ -270,7 +272,7 @@ def example_6_monitoring_and_stats():
     print("EXEMPLE 6: Monitoratge i estadístiques")
     print("="*70 + "\n")
     
-    docstore = DocumentStoreManager(
+    docstore = get_docstore(
         backend='simple',
         persist_path='data/docstore'
     )
@@ -325,7 +327,7 @@ def example_7_comparison_before_after():
     print("\n🔬 DEMOSTRACIÓ:")
     print("-" * 70)
     
-    docstore = DocumentStoreManager(
+    docstore = get_docstore(
         backend='simple',
         persist_path='data/docstore'
     )
@@ -340,6 +342,7 @@ def example_7_comparison_before_after():
     print(f"   ✓ {len(docs)} documents guardats")
     
     # Simular "reinici" - crear nou docstore apuntant al mateix path
+    # (instància nova a propòsit: ha de tornar a carregar des de disc)
     print("\n2️⃣  Segona execució - Recuperar documents existents")
     docstore2 = DocumentStoreManager(
         backend='simple',
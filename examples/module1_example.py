@@ -3,7 +3,10 @@
 Exemple complet d'ús del Mòdul 1: Data Ingestion Pipeline
 """
 
-from typing import Optional
+from typing import Optional, Tuple, Dict, Any
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from functools import lru_cache
+import os
 import sys
 from pathlib import Path
 
@@ -18,9 +21,17 @@ from modules.ingestion import (
     MetadataExtractor,
     DocumentValidator
 )
+from examples._utils import ensure_dir
 from llama_index.core import Document
 import logging
 
+# Barra de progrés opcional (si tqdm no hi és, es recorre sense barra)
+try:
+    from tqdm import tqdm
+except ImportError:
+    def tqdm(iterable, **kwargs):
+        return iterable
+
 # Configurar logging
 logging.basicConfig(
     level=logging.INFO,
@@ -44,6 +55,59 @@ def is_valid_pdf(path: str) -> bool:
 logger = logging.getLogger(__name__)
 
 
+def get_converter(
+    extract_images: bool = True,
+    image_path: str = "data/images",
+    dpi: int = 150
+) -> PDFToMarkdownConverter:
+    """
+    Convertidor compartit entre exemples (un per configuració)
+    """
+    return _get_converter_cached(extract_images, image_path, dpi)
+
+
+@lru_cache(maxsize=8)
+def _get_converter_cached(
+    extract_images: bool,
+    image_path: str,
+    dpi: int
+) -> PDFToMarkdownConverter:
+    return PDFToMarkdownConverter(
+        extract_images=extract_images,
+        image_path=image_path,
+        dpi=dpi
+    )
+
+
+@lru_cache(maxsize=32)
+def list_pdfs(directory: str) -> Tuple[Path, ...]:
+    """
+    Crea el directori si cal i retorna els PDFs que conté (ordenats).
+    Es cacheja: els exemples que comparteixen directori només l'escanegen un cop.
+    """
+    path = ensure_dir(directory)
+    return tuple(sorted(path.glob("*.pdf")))
+
+
+def _process_pdf(
+    pdf_file: Path,
+    converter: PDFToMarkdownConverter,
+    cleaner: TextCleaner,
+    metadata_extractor: MetadataExtractor
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    Converteix, neteja i extreu la metadata d'un PDF.
+    Funció de mòdul perquè es pugui executar en un ProcessPoolExecutor.
+    """
+    markdown_text = converter.convert_file(str(pdf_file))
+    clean_text = cleaner.clean(markdown_text)
+    
+    file_metadata = metadata_extractor.extract_from_file(str(pdf_file))
+    text_metadata = metadata_extractor.extract_from_text(clean_text)
+    
+    return clean_text, {**file_metadata, **text_metadata}
+
+
 def example_1_basic_pdf_conversion():
     """
     Exemple 1: Conversió bàsica de PDFs a Markdown
@@ -53,7 +117,7 @@ def example_1_basic_pdf_conversion():
     print("="*60)
     
     # Inicialitzar convertidor
-    converter = PDFToMarkdownConverter(
+    converter = get_converter(
         extract_images=True,
         image_path="data/images",
         dpi=150
@@ -91,7 +155,7 @@ def example_2_batch_conversion():
     print("EXEMPLE 2: Conversió en batch de directori")
     print("="*60)
     
-    converter = PDFToMarkdownConverter(
+    converter = get_converter(
         extract_images=True,
         image_path="data/images"
     )
@@ -100,14 +164,19 @@ def example_2_batch_conversion():
     output_dir = "data/processed/markdown"
     
     # Crear directoris si no existeixen
-    Path(input_dir).mkdir(parents=True, exist_ok=True)
-    Path(output_dir).mkdir(parents=True, exist_ok=True)
+    pdf_files = list_pdfs(input_dir)
+    ensure_dir(output_dir)
+    
+    if not pdf_files:
+        print(f"⚠️  No hi ha PDFs a {input_dir}")
+        return
     
     try:
         results = converter.convert_directory(
             input_dir=input_dir,
             output_dir=output_dir,
-            add_metadata=True
+            add_metadata=True,
+            max_workers=os.cpu_count() or 1
         )
         
         print(f"✓ Convertits {len(results)} PDFs")
@@ -128,7 +197,7 @@ def example_3_complete_pipeline():
     
     # 1. Configurar components
     loader = DocumentLoader()
-    converter = PDFToMarkdownConverter(extract_images=True, image_path="data/images")
+    converter = get_converter(extract_images=True, image_path="data/images")
     cleaner = TextCleaner(
         remove_extra_whitespace=True,
         normalize_unicode=True,
@@ -150,52 +219,56 @@ def example_3_complete_pipeline():
     # 2. Processar PDFs
     pdf_dir = "data/raw/pdfs"
     processed_docs = []
+    total_chars = 0
+    total_words = 0
     
-    # Crear directori si no existeix
-    Path(pdf_dir).mkdir(parents=True, exist_ok=True)
+    pdf_files = []
+    for pdf_file in list_pdfs(pdf_dir):
+        if not is_valid_pdf(pdf_file):
+            print(f"  ⚠️  Saltant fitxer no vàlid o corromput: {pdf_file.name}")
+            continue
+        pdf_files.append(pdf_file)
     
-    for pdf_file in Path(pdf_dir).glob("*.pdf"):
-        try:
-            print(f"\n📄 Processant: {pdf_file.name}")
-            
-            # Pas 1: Convertir PDF a Markdown
-            print("  1. Convertint PDF → Markdown...")
-            if not is_valid_pdf(pdf_file):
-                print(f"  ⚠️  Saltant fitxer no vàlid o corromput: {pdf_file.name}")
+    # Passos 1-3 (convertir, netejar, extreure metadata) en paral·lel;
+    # la validació es fa aquí perquè el control de duplicats té estat
+    print(f"\n📄 Processant {len(pdf_files)} PDFs en paral·lel...")
+    
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        futures = {
+            executor.submit(_process_pdf, pdf_file, converter, cleaner, metadata_extractor): pdf_file
+            for pdf_file in pdf_files
+        }
+        
+        progress = tqdm(as_completed(futures), total=len(futures), desc="Ingestió")
+        
+        for future in progress:
+            pdf_file = futures[future]
+            try:
+                logger.debug(f"Processat: {pdf_file.name}")
+                clean_text, metadata = future.result()
+                
+                # Pas 4: Crear document
+                document = Document(
+                    text=clean_text,
+                    metadata=metadata
+                )
+                
+                # Pas 5: Validar
+                logger.debug("  Validant document...")
+                validator.validate(document)
+                
+                processed_docs.append(document)
+                total_chars += len(clean_text)
+                total_words += metadata.get('word_count', 0)
+                if logger.isEnabledFor(logging.DEBUG):
+                    print(f"  ✓ Document processat correctament: {pdf_file.name}")
+                    print(f"    - Text: {len(clean_text)} caràcters")
+                    print(f"    - Paraules: {metadata['word_count']}")
+                    print(f"    - Idioma: {metadata.get('language', 'unknown')}")
+                
+            except Exception as e:
+                print(f"  ✗ Error amb {pdf_file.name}: {e}")
                 continue
-
-            markdown_text = converter.convert_file(str(pdf_file))
-
-            # Pas 2: Netejar text
-            print("  2. Netejant text...")
-            clean_text = cleaner.clean(markdown_text)
-
-            # Pas 3: Extreure metadata
-            print("  3. Extraient metadata...")
-            file_metadata = metadata_extractor.extract_from_file(str(pdf_file))
-
-            text_metadata = metadata_extractor.extract_from_text(clean_text)
-            metadata = {**file_metadata, **text_metadata}
-            
-            # Pas 4: Crear document
-            document = Document(
-                text=clean_text,
-                metadata=metadata
-            )
-            
-            # Pas 5: Validar
-            print("  4. Validant document...")
-            validator.validate(document)
-            
-            processed_docs.append(document)
-            print(f"  ✓ Document processat correctament")
-            print(f"    - Text: {len(clean_text)} caràcters")
-            print(f"    - Paraules: {metadata['word_count']}")
-            print(f"    - Idioma: {metadata.get('language', 'unknown')}")
-            
-        except Exception as e:
-            print(f"  ✗ Error: {e}")
-            continue
     
     # Resum final
     print(f"\n{'='*60}")
@@ -204,8 +277,6 @@ def example_3_complete_pipeline():
     print(f"Documents processats correctament: {len(processed_docs)}")
     
     if processed_docs:
-        total_chars = sum(len(doc.text) for doc in processed_docs)
-        total_words = sum(doc.metadata.get('word_count', 0) for doc in processed_docs)
         print(f"Total caràcters: {total_chars:,}")
         print(f"Total paraules: {total_words:,}")
     
@@ -229,7 +300,7 @@ def example_4_load_and_validate():
     markdown_dir = "data/processed/markdown"
     
     # Crear directori si no existeix
-    Path(markdown_dir).mkdir(parents=True, exist_ok=True)
+    ensure_dir(markdown_dir)
     
     try:
         # Carregar documents
@@ -244,7 +315,11 @@ def example_4_load_and_validate():
         
         # Validar en batch
         print("\n🔍 Validant documents...")
-        results = validator.validate_batch(documents, stop_on_error=False)
+        results = validator.validate_batch(
+            documents,
+            stop_on_error=False,
+            n_workers=os.cpu_count() or 1
+        )
         
         print(f"\n{'='*60}")
         print(f"RESULTATS DE VALIDACIÓ")
@@ -282,7 +357,7 @@ def example_5_metadata_enrichment():
     test_file = "data/raw/exemple.txt"
     
     # Crear fitxer de prova si no existeix
-    Path("data/raw").mkdir(parents=True, exist_ok=True)
+    ensure_dir("data/raw")
     if not Path(test_file).exists():
         Path(test_file).write_text("Document de prova")
     
@@ -326,7 +401,7 @@ def example_6_document_stats():
     ]
     
     for directory in directories:
-        Path(directory).mkdir(parents=True, exist_ok=True)
+        ensure_dir(directory)
         
         print(f"\n📊 Estadístiques de: {directory}")
         print("-" * 60)
@@ -3,10 +3,18 @@
 Exemple complet d'ús del Mòdul 2: Document Processing & Indexing
 """
 
+import os
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+# Fils d'OpenMP/MKL: s'han de fixar abans que es carregui torch
+_CPU_COUNT = os.cpu_count() or 1
+os.environ.setdefault("OMP_NUM_THREADS", str(_CPU_COUNT))
+os.environ.setdefault("MKL_DYNAMIC", "FALSE")
+
 from modules.ingestion.docstore import DocumentStoreManager
 from modules.processing import (
     ChunkingStrategy,
@@ -18,15 +26,109 @@ from modules.processing import (
     build_complete_pipeline
 )
 from llama_index.core import Document
+import numpy as np
 import logging
 
+# Dispositiu per als embeddings: GPU si n'hi ha
+_DEVICE = 'cpu'
+
+# Paral·lelisme intra-op de torch per als embeddings en CPU (un sol cop)
+try:
+    import torch
+    if torch.cuda.is_available():
+        _DEVICE = 'cuda'
+    _TORCH_THREADS = max(1, _CPU_COUNT - 1)
+    if torch.get_num_threads() != _TORCH_THREADS:
+        torch.set_num_threads(_TORCH_THREADS)
+    try:
+        torch.set_num_interop_threads(2)
+    except RuntimeError:
+        # Ja fixat (només es pot fer abans de la primera feina en paral·lel)
+        pass
+except ImportError:
+    pass
+
 # Configurar logging
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'  # asctime sense mil·lisegons
 )
 logger = logging.getLogger(__name__)
 
+# Biblioteques sorolloses: només avisos (menys registres a formatar)
+for _name in ('sentence_transformers', 'chromadb', 'llama_index', 'httpx'):
+    logging.getLogger(_name).setLevel(logging.WARNING)
+
+# Generador únic per als embeddings dummy (normal, més semblant a embeddings reals)
+_RNG = np.random.default_rng(np.random.SeedSequence(42))
+
+
+@lru_cache(maxsize=None)
+def _get_embedder(
+    model_name: str,
+    batch_size: int = 32,
+    device: str = _DEVICE,
+    cache_path: str = 'data/cache/embeddings'
+) -> EmbeddingGenerator:
+    """
+    Retorna un EmbeddingGenerator compartit per model: el model de
+    HuggingFace només es carrega un cop encara que s'executin tots els exemples.
+    batch_size >= 32 perquè la GPU no quedi infrautilitzada. Els embeddings
+    es guarden a cache_path: en tornar a executar no es recalculen.
+    """
+    return EmbeddingGenerator(
+        model_name=model_name,
+        batch_size=batch_size,
+        cache_path=cache_path,
+        device=device
+    )
+
+
+def quantize_uint8(vectors: np.ndarray):
+    """
+    Quantització escalar per vector a 8 bits (4x menys memòria que float32)
+    
+    Args:
+        vectors: Matriu (N, D) float32
+        
+    Returns:
+        (q, alpha, shift): codis uint8 i paràmetres per desquantitzar
+        amb q * alpha + shift
+    """
+    shift = vectors.min(axis=1, keepdims=True)
+    alpha = (vectors.max(axis=1, keepdims=True) - shift) / 255
+    alpha[alpha == 0] = 1.0
+    q = np.rint((vectors - shift) / alpha).astype(np.uint8)
+    return q, alpha.ravel(), shift.ravel()
+
+
+def dequantize_uint8(q: np.ndarray, alpha: np.ndarray, shift: np.ndarray) -> np.ndarray:
+    """Reconstrueix els vectors float32 a partir dels codis uint8"""
+    return q.astype(np.float32) * alpha[:, None] + shift[:, None]
+
+
+def binarize(vectors: np.ndarray) -> np.ndarray:
+    """
+    Quantització binària: 1 bit per dimensió (384 dims → 48 bytes)
+    
+    Args:
+        vectors: Matriu (N, D) float32
+        
+    Returns:
+        Matriu (N, D/8) uint8 amb els bits empaquetats
+    """
+    return np.packbits(vectors > vectors.mean(axis=1, keepdims=True), axis=1)
+
+
+def hamming_distances(query_bits: np.ndarray, doc_bits: np.ndarray) -> np.ndarray:
+    """Distància de Hamming (popcount de l'XOR) entre una query i tots els documents"""
+    diff = np.bitwise_xor(doc_bits, query_bits)
+    if hasattr(np, 'bitwise_count'):
+        # NumPy >= 2.0: popcount natiu
+        return np.bitwise_count(diff).sum(axis=1)
+    return np.unpackbits(diff, axis=1).sum(axis=1)
+
 
 def example_1_chunking():
     """
@@ -111,14 +213,12 @@ def example_2_embeddings():
     print(f"\n📊 Nodes preparats: {len(nodes)}")
     
     # Provar amb model local (no requereix API key)
-    print("\n🤖 Model: BGE-M3 (multilingüe, local)")
+    print("\n🤖 Model: BGE-small (lleuger, local)")
     
     try:
-        embedder = EmbeddingGenerator(
-            model_name='bge-m3',
-            batch_size=10
-        )
+        embedder = _get_embedder('bge-small')
         
+        print(f"  ✓ Dispositiu: {_DEVICE}")
         print(f"  ✓ Model info:")
         info = embedder.get_model_info()
         print(f"    - Dimensions: {info['dimensions']}")
@@ -127,14 +227,19 @@ def example_2_embeddings():
         
         # Generar embeddings
         print(f"\n  🔄 Generant embeddings...")
-        nodes = embedder.embed_nodes(nodes, show_progress=False)
+        # sort_by_length: batches de textos de longitud similar (menys padding)
+        nodes = embedder.embed_nodes(
+            nodes,
+            show_progress=False,
+            sort_by_length=True
+        )
         
         print(f"  ✓ Embeddings generats!")
         print(f"  ✓ Dimensions: {len(nodes[0].embedding)}")
         print(f"  ✓ Primer embedding (preview): {nodes[0].embedding[:5]}...")
         
     except Exception as e:
-        print(f"  ⚠️  Error amb BGE-M3: {e}")
+        print(f"  ⚠️  Error amb BGE-small: {e}")
         print(f"  💡 Instal·la: pip install sentence-transformers torch")
 
 
@@ -157,35 +262,55 @@ def example_3_vector_store():
             dimension=384  # Per bge-small o similar
         )
         
+        # Per a col·leccions grans (>10k vectors) és més ràpid
+        # backend='faiss-ivfpq' (s'entrena sol a add_nodes_bulk)
+        
         print(f"  ✓ Vector store creat")
         print(f"  ✓ Backend: {vector_store.backend}")
         print(f"  ✓ Col·lecció: {vector_store.collection_name}")
         
-        # Crear nodes amb embeddings dummy
-        from llama_index.core.schema import TextNode
-        import random
+        # Embeddings dummy (aleatoris) generats d'un sol cop, guardats a
+        # disc com a float16 mapejat a memòria (meitat de bytes que float32)
+        emb_path = vector_store.persist_path / 'embeddings.f16'
+        emb_mm = np.memmap(emb_path, dtype=np.float16, mode='w+', shape=(5, 384))
+        emb_mm[:] = _RNG.standard_normal((5, 384), dtype=np.float32)
+        emb_mm.flush()
+        print(f"  ✓ Embeddings a {emb_path} ({emb_mm.nbytes} bytes, float16)")
+        embeddings = emb_mm.astype(np.float32)
         
-        nodes = []
-        for i in range(5):
-            node = TextNode(
-                text=f"Document {i} sobre política de vacances",
-                metadata={'doc_id': i, 'department': 'HR'}
-            )
-            # Embedding dummy (random)
-            node.embedding = [random.random() for _ in range(384)]
-            nodes.append(node)
+        # Quantització a 8 bits: és el que es guardaria; ChromaDB només
+        # accepta float32, així que se li passa la versió desquantitzada
+        q, alpha, shift = quantize_uint8(embeddings)
+        dequantized = dequantize_uint8(q, alpha, shift)
+        print(f"  ✓ Memòria vectors: {embeddings.nbytes} bytes (float32) "
+              f"→ {q.nbytes} bytes (uint8)")
+        
+        # Llistes alineades → un sol upsert
+        n = len(dequantized)
+        ids = [f"doc-{i}" for i in range(n)]
+        texts = [f"Document {i} sobre política de vacances" for i in range(n)]
+        metadatas = [
+            {
+                'doc_id': i,
+                'department': 'HR',
+                'q_alpha': float(alpha[i]),
+                'q_shift': float(shift[i])
+            }
+            for i in range(n)
+        ]
         
-        print(f"\n  📥 Afegint {len(nodes)} nodes...")
-        results = vector_store.add_nodes(nodes, show_progress=False)
+        print(f"\n  📥 Afegint {n} nodes...")
+        results = vector_store.add_nodes_bulk(ids, dequantized, metadatas, texts)
         
         print(f"  ✓ Nodes afegits: {results['added']}")
         
-        # Query
+        # Query: buffer float32 omplert in situ; el store rep una List[float]
         print(f"\n  🔍 Provant cerca vectorial...")
-        query_embedding = [random.random() for _ in range(384)]
+        query_buf = np.empty(384, dtype=np.float32)
+        _RNG.standard_normal(dtype=np.float32, out=query_buf)
         
         results = vector_store.query(
-            query_embedding=query_embedding,
+            query_embedding=query_buf.tolist(),
             top_k=3
         )
         
@@ -335,6 +460,7 @@ def example_5_complete_pipeline():
                 documents=documents[:2],  # Només 2 per rapidesa
                 chunking_strategy='sentence',
                 embedding_model='bge-small',  # Més ràpid que bge-m3
+                embedder=_get_embedder('bge-small'),  # Reutilitza el de l'exemple 2
                 vector_store_backend='chroma'
             )
             
@@ -371,24 +497,29 @@ def example_6_hybrid_search():
     print("="*70)
     
     from llama_index.core.schema import TextNode
-    import random
     
-    # Crear nodes amb embeddings i metadata
-    nodes = []
+    # Crear nodes amb embeddings i metadata (tot generat d'un cop)
+    n = 10
     departments = ['IT', 'Legal', 'HR', 'Finance']
     languages = ['ca', 'es', 'en']
+    dept_col = [departments[i % len(departments)] for i in range(n)]
+    lang_col = [languages[i % len(languages)] for i in range(n)]
+    prio_col = _RNG.choice(['high', 'medium', 'low'], size=n).tolist()
+    embeddings = _RNG.standard_normal((n, 384), dtype=np.float32)
+    embedding_rows = embeddings.tolist()
     
-    for i in range(10):
-        node = TextNode(
+    nodes = [
+        TextNode(
             text=f"Document {i} amb contingut important",
             metadata={
-                'department': departments[i % len(departments)],
-                'language': languages[i % len(languages)],
-                'priority': random.choice(['high', 'medium', 'low'])
-            }
+                'department': dept_col[i],
+                'language': lang_col[i],
+                'priority': prio_col[i]
+            },
+            embedding=embedding_rows[i]
         )
-        node.embedding = [random.random() for _ in range(384)]
-        nodes.append(node)
+        for i in range(n)
+    ]
     
     print(f"\n📋 Creats {len(nodes)} nodes amb metadata")
     
@@ -398,8 +529,14 @@ def example_6_hybrid_search():
     
     print(f"  ✓ Metadata indexada")
     
-    # Simular resultats vectorials
-    vector_node_ids = [n.node_id for n in nodes[:7]]  # Top 7 de vectorial
+    # Resultats vectorials amb vectors binaris (Hamming en lloc de cosinus)
+    doc_bits = binarize(embeddings)
+    query_bits = binarize(_RNG.standard_normal((1, 384), dtype=np.float32))
+    ranking = np.argsort(hamming_distances(query_bits, doc_bits), kind='stable')
+    vector_node_ids = [nodes[i].node_id for i in ranking[:7]]  # Top 7 de vectorial
+    
+    print(f"  ✓ Vectors binaris: {doc_bits.nbytes} bytes "
+          f"(float32: {embeddings.nbytes} bytes)")
     
     print(f"\n🔍 Cerca híbrida:")
     print(f"  - Resultats vectorials: {len(vector_node_ids)}")
@@ -422,6 +559,21 @@ def example_6_hybrid_search():
         print(f"    ✓ {node_id[:8]}... → {node_meta}")
 
 
+def _run_example(name, func):
+    """Executa un exemple registrant l'error sense aturar la resta"""
+    try:
+        func()
+    except Exception as e:
+        print(f"\n❌ Error en '{name}': {e}")
+        logger.exception("Error en exemple %s", name)
+
+
+def _run_group(group):
+    """Executa en ordre els exemples d'un grup"""
+    for name, func in group:
+        _run_example(name, func)
+
+
 def main():
     """Executar tots els exemples"""
     print("\n" + "🚀 " + "="*68)
@@ -437,16 +589,24 @@ def main():
         ("Hybrid Search", example_6_hybrid_search)
     ]
     
-    for name, func in examples:
-        try:
-            func()
-        except KeyboardInterrupt:
-            print(f"\n⚠️  Interromput per l'usuari")
-            break
-        except Exception as e:
-            print(f"\n❌ Error en '{name}': {e}")
-            logger.exception(f"Error en exemple {name}")
-            continue
+    if os.environ.get("PARALLEL_EXAMPLES") == "1":
+        # Grups independents en fils (la sortida s'intercala). El 2 i el 5
+        # van al mateix grup i en ordre: comparteixen el model d'embeddings
+        by_name = dict(examples)
+        groups = [
+            [(n, by_name[n]) for n in ("Chunking Strategies", "Metadata Index", "Hybrid Search")],
+            [(n, by_name[n]) for n in ("Embedding Generation", "Complete Pipeline")],
+            [("Vector Store", by_name["Vector Store"])]
+        ]
+        with ThreadPoolExecutor(max_workers=len(groups)) as executor:
+            list(executor.map(_run_group, groups))
+    else:
+        for name, func in examples:
+            try:
+                _run_example(name, func)
+            except KeyboardInterrupt:
+                print(f"\n⚠️  Interromput per l'usuari")
+                break
     
     print("\n" + "="*70)
     print("✅ EXEMPLES COMPLETATS")
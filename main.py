@@ -5,11 +5,17 @@ Sistema Principal de Pruebas - Módulo 1: Data Ingestion Pipeline
 Arquitectura RAG Empresarial - MIT-Grade Design
 """
 
+import os
 import sys
+import atexit
+import queue
+import threading
+import logging.handlers
 from pathlib import Path
 from typing import List, Dict, Any, Optional
 import logging
 from datetime import datetime
+from functools import lru_cache
 
 # Configuración de paths
 sys.path.insert(0, str(Path(__file__).parent))
@@ -29,19 +35,76 @@ from modules.ingestion.docstore import (
 from llama_index.core import Document
 from config.ingestion_config import config, setup_directories
 
-# Configuración de logging profesional
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s | %(name)-20s | %(levelname)-8s | %(message)s',
-    datefmt='%Y-%m-%d %H:%M:%S',
-    handlers=[
-        logging.StreamHandler(sys.stdout),
-        logging.FileHandler('logs/main_execution.log', mode='a')
-    ]
+# Configuración de logging profesional: los registros se encolan y un hilo
+# (QueueListener) los escribe en consola y fichero fuera del camino crítico
+_log_formatter = logging.Formatter(
+    '%(asctime)s | %(name)-20s | %(levelname)-8s | %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
 )
+_log_handlers = [
+    logging.StreamHandler(sys.stdout),
+    logging.FileHandler('logs/main_execution.log', mode='a')
+]
+for _handler in _log_handlers:
+    _handler.setFormatter(_log_formatter)
+
+_log_queue = queue.Queue(-1)
+_log_listener = logging.handlers.QueueListener(_log_queue, *_log_handlers)
+_log_listener.start()
+atexit.register(_log_listener.stop)  # Vacía la cola al salir
+
+_queue_handler = logging.handlers.QueueHandler(_log_queue)
+_queue_handler.setFormatter(logging.Formatter('%(message)s'))
+logging.basicConfig(level=logging.INFO, handlers=[_queue_handler])
 logger = logging.getLogger(__name__)
 
 
+def _init_pdf_worker():
+    """Inicializador de los procesos de conversión en paralelo"""
+    # El QueueListener solo vive en el proceso principal: los workers escriben directamente
+    logging.getLogger().handlers = list(_log_handlers)
+
+# Escritura de markdowns: buffer de 1 MB; a partir de 4 MB se libera la page cache
+_WRITE_BUFFER_SIZE = 1024 * 1024
+_LARGE_FILE_BYTES = 4 * 1024 * 1024
+
+
+# Factorías de componentes sin estado, cacheadas por sus parámetros (valores
+# escalares de la config): llamadas repetidas reutilizan la misma instancia.
+# El validador y el DocStore guardan estado y se crean siempre de nuevo.
+@lru_cache(maxsize=None)
+def _make_loader() -> DocumentLoader:
+    return DocumentLoader()
+
+
+@lru_cache(maxsize=None)
+def _make_converter(extract_images: bool, image_path: str, dpi: int) -> PDFToMarkdownConverter:
+    return PDFToMarkdownConverter(
+        extract_images=extract_images,
+        image_path=image_path,
+        dpi=dpi
+    )
+
+
+@lru_cache(maxsize=None)
+def _make_cleaner(
+    remove_extra_whitespace: bool,
+    normalize_unicode: bool,
+    min_line_length: int
+) -> TextCleaner:
+    return TextCleaner(
+        remove_extra_whitespace=remove_extra_whitespace,
+        normalize_unicode=normalize_unicode,
+        min_line_length=min_line_length
+    )
+
+
+@lru_cache(maxsize=None)
+def _make_extractor(custom_fields_json: str) -> MetadataExtractor:
+    # La clave de cache es el JSON crudo; los campos son los ya validados por la config
+    return MetadataExtractor(custom_fields=config.CUSTOM_METADATA_FIELDS)
+
+
 class IngestionSystemTester:
     """
     Sistema profesional de testing para el pipeline de ingestión
@@ -58,6 +121,9 @@ class IngestionSystemTester:
             'errors': []
         }
         
+        # PDFs de RAW_DATA_DIR (ordenados), buscados una sola vez en initialize_system
+        self._pdf_files: List[Path] = []
+        
     def initialize_system(self):
         """Inicializa todos los componentes del sistema"""
         logger.info("="*80)
@@ -68,24 +134,21 @@ class IngestionSystemTester:
             # 1. Setup de directorios
             logger.info("📁 Configurando estructura de directorios...")
             setup_directories()
+            self._pdf_files = sorted(Path(config.RAW_DATA_DIR).rglob("*.pdf"))
             
             # 2. Inicializar componentes
             logger.info("🔧 Inicializando componentes del pipeline...")
             self.components = {
-                'loader': DocumentLoader(),
-                'converter': PDFToMarkdownConverter(
-                    extract_images=config.PDF_EXTRACT_IMAGES,
-                    image_path=config.IMAGES_DIR,
-                    dpi=config.PDF_IMAGE_DPI
-                ),
-                'cleaner': TextCleaner(
-                    remove_extra_whitespace=config.REMOVE_EXTRA_WHITESPACE,
-                    normalize_unicode=config.NORMALIZE_UNICODE,
-                    min_line_length=config.MIN_LINE_LENGTH
+                'loader': _make_loader(),
+                'converter': _make_converter(
+                    config.PDF_EXTRACT_IMAGES, config.IMAGES_DIR, config.PDF_IMAGE_DPI
                 ),
-                'extractor': MetadataExtractor(
-                    custom_fields=config.CUSTOM_METADATA_FIELDS
+                'cleaner': _make_cleaner(
+                    config.REMOVE_EXTRA_WHITESPACE,
+                    config.NORMALIZE_UNICODE,
+                    config.MIN_LINE_LENGTH
                 ),
+                'extractor': _make_extractor(config.CUSTOM_METADATA_FIELDS_JSON),
                 'validator': DocumentValidator(
                     min_text_length=config.MIN_TEXT_LENGTH,
                     max_text_length=config.MAX_TEXT_LENGTH,
@@ -97,8 +160,8 @@ class IngestionSystemTester:
             # 3. Inicializar DocStore
             logger.info("💾 Inicializando Document Store...")
             self.docstore = DocumentStoreManager(
-                backend='simple',
-                persist_path='data/docstore'
+                backend=config.DOCSTORE_BACKEND,
+                persist_path=config.DOCSTORE_PATH
             )
             
             logger.info("✅ Sistema inicializado correctamente")
@@ -142,8 +205,7 @@ class IngestionSystemTester:
             converter = self.components['converter']
             
             # Buscar PDFs disponibles
-            pdf_dir = Path(config.RAW_DATA_DIR)
-            pdf_files = list(pdf_dir.glob("**/*.pdf"))
+            pdf_files = self._pdf_files
             
             if not pdf_files:
                 logger.warning("⚠️  No se encontraron PDFs para convertir")
@@ -157,20 +219,35 @@ class IngestionSystemTester:
             markdown_dir = Path(config.MARKDOWN_OUTPUT_DIR)
             markdown_dir.mkdir(parents=True, exist_ok=True)
             
-            # Convertir primer PDF como prueba
+            # Convertir primer PDF como prueba, escribiendo cada página
+            # a disco a medida que se genera
             test_pdf = pdf_files[0]
             logger.info(f"🔄 Convirtiendo: {test_pdf.name}")
             
-            markdown_text = converter.convert_file(str(test_pdf))
+            output_file = markdown_dir / f"{test_pdf.stem}.md"
+            char_count = 0
+            word_count = 0
+            preview = ''
+            
+            # Escritura binaria con buffer grande (sin capa de texto intermedia)
+            with open(output_file, 'wb', buffering=_WRITE_BUFFER_SIZE) as f:
+                for chunk in converter.convert_file_streaming(str(test_pdf)):
+                    f.write(chunk.encode('utf-8'))
+                    char_count += len(chunk)
+                    word_count += len(chunk.split())
+                    if len(preview) < 200:
+                        preview += chunk[:200 - len(preview)]
+                
+                # Markdowns grandes: indicar al kernel que no hace falta
+                # mantenerlos en la page cache (solo un aviso, sin fsync)
+                f.flush()
+                if hasattr(os, 'posix_fadvise') and f.tell() > _LARGE_FILE_BYTES:
+                    os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
             
             logger.info(f"✓ Conversión exitosa")
-            logger.info(f"  - Caracteres: {len(markdown_text):,}")
-            logger.info(f"  - Palabras: ~{len(markdown_text.split()):,}")
-            logger.info(f"  - Preview: {markdown_text[:200]}...")
-            
-            # GUARDAR EL MARKDOWN A DISCO
-            output_file = markdown_dir / f"{test_pdf.stem}.md"
-            output_file.write_text(markdown_text, encoding='utf-8')
+            logger.info(f"  - Caracteres: {char_count:,}")
+            logger.info(f"  - Palabras: ~{word_count:,}")
+            logger.info(f"  - Preview: {preview}...")
             logger.info(f"💾 Markdown guardado en: {output_file}")
             
             self._record_test_pass("PDF Conversion")
@@ -239,6 +316,11 @@ class IngestionSystemTester:
             # Extraer metadata del archivo
             file_metadata = extractor.extract_from_file(str(test_file))
             
+            # El mismo contenido en memoria debe dar el mismo hash
+            bytes_metadata = extractor.extract_from_bytes(test_file.name, test_content.encode('utf-8'))
+            if bytes_metadata['file_hash'] != file_metadata['file_hash']:
+                raise ValueError("extract_from_bytes y extract_from_file dan hashes distintos")
+            
             # Extraer metadata del texto
             text_metadata = extractor.extract_from_text(test_content)
             
@@ -379,8 +461,7 @@ class IngestionSystemTester:
             converter = self.components['converter']
             
             # Buscar PDFs
-            pdf_dir = Path(config.RAW_DATA_DIR)
-            pdf_files = list(pdf_dir.glob("**/*.pdf"))
+            pdf_files = self._pdf_files
             
             if not pdf_files:
                 logger.warning("⚠️  No se encontraron PDFs para convertir")
@@ -391,11 +472,13 @@ class IngestionSystemTester:
             logger.info(f"📂 PDFs encontrados: {len(pdf_files)}")
             logger.info(f"🔄 Convirtiendo TODOS los PDFs a Markdown...")
             
-            # Conversión en batch
+            # Conversión en batch (un proceso por PDF, hasta MAX_WORKERS)
             results = converter.convert_directory(
                 input_dir=config.RAW_DATA_DIR,
                 output_dir=config.MARKDOWN_OUTPUT_DIR,
-                add_metadata=True
+                add_metadata=True,
+                max_workers=config.MAX_WORKERS,
+                initializer=_init_pdf_worker
             )
             
             logger.info(f"✅ Conversión batch completada:")
@@ -403,12 +486,13 @@ class IngestionSystemTester:
             logger.info(f"  - Convertidos: {len(results)}")
             logger.info(f"  - Tasa de éxito: {len(results)/len(pdf_files)*100:.1f}%")
             
-            # Listar archivos generados
+            # Listar archivos generados (un solo recorrido del directorio)
             logger.info(f"\n📄 Archivos Markdown generados:")
+            with os.scandir(config.MARKDOWN_OUTPUT_DIR) as entries:
+                sizes = {entry.name: entry.stat().st_size for entry in entries}
             for pdf_name, md_path in results.items():
-                md_file = Path(md_path)
-                size_kb = md_file.stat().st_size / 1024
-                logger.info(f"  ✓ {pdf_name} → {md_file.name} ({size_kb:.1f} KB)")
+                md_name = Path(md_path).name
+                logger.info("  ✓ %s → %s (%.1f KB)", pdf_name, md_name, sizes.get(md_name, 0) / 1024)
             
             self._record_test_pass("Batch PDF Conversion")
             return True
@@ -425,8 +509,7 @@ class IngestionSystemTester:
         
         try:
             # Buscar PDFs
-            pdf_dir = Path(config.RAW_DATA_DIR)
-            pdf_files = list(pdf_dir.glob("**/*.pdf"))
+            pdf_files = self._pdf_files
             
             if not pdf_files:
                 logger.info("⚠️  No hay PDFs para procesar")
@@ -436,41 +519,75 @@ class IngestionSystemTester:
             
             logger.info(f"📂 Procesando {len(pdf_files)} PDFs con pipeline completo...")
             
+            # Pipeline en 3 etapas (hilos + colas con backpressure) para
+            # solapar la E/S (lectura de PDF, escritura del docstore) con
+            # la limpieza y extracción de metadata
+            converter = self.components['converter']
+            cleaner = self.components['cleaner']
+            extractor = self.components['extractor']
+            validator = self.components['validator']
+            
+            q_ab = queue.Queue(maxsize=4)
+            q_bc = queue.Queue(maxsize=4)
+            processed_docs = []
+            
+            def stage_convert():
+                # Etapa A: leer y convertir
+                for pdf_file in pdf_files[:3]:  # Limitar a 3 para testing
+                    try:
+                        logger.info(f"\n🔄 Procesando: {pdf_file.name}")
+                        markdown = converter.convert_file(str(pdf_file))
+                        logger.info(f"  ✓ Conversión: {len(markdown):,} chars")
+                        q_ab.put((pdf_file, markdown))
+                    except Exception as e:
+                        logger.error(f"  ✗ Error ({pdf_file.name}): {e}")
+                q_ab.put(None)
+            
+            def stage_clean():
+                # Etapa B: limpiar y extraer metadata
+                while (item := q_ab.get()) is not None:
+                    pdf_file, markdown = item
+                    try:
+                        clean_text = cleaner.clean(markdown)
+                        logger.info(f"  ✓ Limpieza: {len(clean_text):,} chars")
+                        
+                        file_meta = extractor.extract_from_file(str(pdf_file))
+                        text_meta = extractor.extract_from_text(clean_text)
+                        metadata = {**file_meta, **text_meta}
+                        logger.info(f"  ✓ Metadata: {len(metadata)} campos")
+                        
+                        q_bc.put(Document(text=clean_text, metadata=metadata))
+                    except Exception as e:
+                        logger.error(f"  ✗ Error ({pdf_file.name}): {e}")
+                q_bc.put(None)
+            
+            def stage_store():
+                # Etapa C: validar (se guardan todos juntos al final)
+                while (doc := q_bc.get()) is not None:
+                    try:
+                        validator.validate(doc)
+                        logger.info(f"  ✓ Validación: OK")
+                        processed_docs.append(doc)
+                    except Exception as e:
+                        logger.error(f"  ✗ Error: {e}")
+            
+            stages = [
+                threading.Thread(target=stage, name=stage.__name__)
+                for stage in (stage_convert, stage_clean, stage_store)
+            ]
+            for thread in stages:
+                thread.start()
+            for thread in stages:
+                thread.join()
+            
+            # Guardar en bloque: un solo persist del docstore
             processed_count = 0
-            for pdf_file in pdf_files[:3]:  # Limitar a 3 para testing
-                try:
-                    logger.info(f"\n🔄 Procesando: {pdf_file.name}")
-                    
-                    # Paso 1: Convertir
-                    markdown = self.components['converter'].convert_file(str(pdf_file))
-                    logger.info(f"  ✓ Conversión: {len(markdown):,} chars")
-                    
-                    # Paso 2: Limpiar
-                    clean_text = self.components['cleaner'].clean(markdown)
-                    logger.info(f"  ✓ Limpieza: {len(clean_text):,} chars")
-                    
-                    # Paso 3: Metadata
-                    file_meta = self.components['extractor'].extract_from_file(str(pdf_file))
-                    text_meta = self.components['extractor'].extract_from_text(clean_text)
-                    metadata = {**file_meta, **text_meta}
-                    logger.info(f"  ✓ Metadata: {len(metadata)} campos")
-                    
-                    # Paso 4: Crear documento
-                    doc = Document(text=clean_text, metadata=metadata)
-                    
-                    # Paso 5: Validar
-                    self.components['validator'].validate(doc)
-                    logger.info(f"  ✓ Validación: OK")
-                    
-                    # Paso 6: Guardar
-                    self.docstore.add_documents([doc])
-                    logger.info(f"  ✓ Almacenado: OK")
-                    
-                    processed_count += 1
-                    
-                except Exception as e:
-                    logger.error(f"  ✗ Error: {e}")
-                    continue
+            if processed_docs:
+                store_results = self.docstore.add_documents(processed_docs)
+                processed_count = store_results['added'] + store_results['updated']
+                logger.info(f"  ✓ Almacenados: {processed_count} documentos")
+                for error in store_results['errors']:
+                    logger.error(f"  ✗ Error: {error}")
             
             logger.info(f"\n✅ Pipeline completado: {processed_count}/{len(pdf_files[:3])} documentos")
             
@@ -597,13 +714,17 @@ def interactive_menu(tester: IngestionSystemTester):
         elif choice == '11':
             markdown_dir = Path(config.MARKDOWN_OUTPUT_DIR)
             if markdown_dir.exists():
-                md_files = list(markdown_dir.glob("*.md"))
+                with os.scandir(markdown_dir) as entries:
+                    md_files = sorted(
+                        (entry.name, entry.stat()) for entry in entries
+                        if entry.name.endswith('.md') and entry.is_file()
+                    )
                 if md_files:
                     print(f"\n📄 ARCHIVOS MARKDOWN GENERADOS ({len(md_files)}):")
-                    for md_file in sorted(md_files):
-                        size_kb = md_file.stat().st_size / 1024
-                        mod_time = datetime.fromtimestamp(md_file.stat().st_mtime)
-                        print(f"  ✓ {md_file.name}")
+                    for md_name, md_stat in md_files:
+                        size_kb = md_stat.st_size / 1024
+                        mod_time = datetime.fromtimestamp(md_stat.st_mtime)
+                        print(f"  ✓ {md_name}")
                         print(f"    - Tamaño: {size_kb:.1f} KB")
                         print(f"    - Modificado: {mod_time.strftime('%Y-%m-%d %H:%M:%S')}")
                 else:
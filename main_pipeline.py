@@ -5,10 +5,17 @@ Pipeline Complet: Mòdul 1 (Ingestion) + Mòdul 2 (Processing & Indexing)
 De PDFs a Sistema de Cerca Vectorial Funcional
 """
 
+import os
 import sys
+import atexit
+import queue
 from pathlib import Path
+from multiprocessing import Pool
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
 import logging
-from datetime import datetime
+import logging.handlers
+import time
 
 # Setup paths
 sys.path.insert(0, str(Path(__file__).parent))
@@ -35,17 +42,97 @@ from modules.processing import (
 
 from llama_index.core import Document
 
-# Configurar logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s | %(name)-20s | %(levelname)-8s | %(message)s',
-    handlers=[
-        logging.StreamHandler(sys.stdout),
-        logging.FileHandler('logs/pipeline_complete.log', mode='a')
-    ]
-)
+# Configurar logging: els registres s'encuen i un fil (QueueListener)
+# els escriu a consola i fitxer, fora del bucle de processament
+_log_formatter = logging.Formatter('%(asctime)s | %(name)-20s | %(levelname)-8s | %(message)s')
+_log_handlers = [
+    logging.StreamHandler(sys.stdout),
+    logging.FileHandler('logs/pipeline_complete.log', mode='a')
+]
+for _handler in _log_handlers:
+    _handler.setFormatter(_log_formatter)
+
+_log_queue = queue.Queue(-1)
+_log_listener = logging.handlers.QueueListener(_log_queue, *_log_handlers)
+_log_listener.start()
+atexit.register(_log_listener.stop)  # Buida la cua en sortir
+
+_queue_handler = logging.handlers.QueueHandler(_log_queue)
+_queue_handler.setFormatter(logging.Formatter('%(message)s'))
+logging.basicConfig(level=logging.INFO, handlers=[_queue_handler])
 logger = logging.getLogger(__name__)
 
+# Documents acumulats abans de cada add_documents al DocStore en el pas 2
+_DOCSTORE_FLUSH_EVERY = 32
+
+
+def _make_ingestion_components() -> Tuple[PDFToMarkdownConverter, TextCleaner, MetadataExtractor]:
+    """Crea els components de conversió del Mòdul 1 (sense estat compartit)"""
+    pdf_converter = PDFToMarkdownConverter(
+        extract_images=True,
+        image_path="data/images"
+    )
+    text_cleaner = TextCleaner(
+        remove_extra_whitespace=True,
+        normalize_unicode=True
+    )
+    metadata_extractor = MetadataExtractor()
+    return pdf_converter, text_cleaner, metadata_extractor
+
+
+def _convert_pdf(
+    pdf_converter: PDFToMarkdownConverter,
+    text_cleaner: TextCleaner,
+    metadata_extractor: MetadataExtractor,
+    pdf_path: str
+) -> Tuple[str, Dict[str, Any]]:
+    """Converteix, neteja i extreu metadata d'un PDF. Retorna (text net, metadata)"""
+    markdown = pdf_converter.convert_file(pdf_path)
+    return _clean_and_extract(text_cleaner, metadata_extractor, pdf_path, markdown)
+
+
+def _clean_and_extract(
+    text_cleaner: TextCleaner,
+    metadata_extractor: MetadataExtractor,
+    pdf_path: str,
+    markdown: str
+) -> Tuple[str, Dict[str, Any]]:
+    """Neteja el markdown d'un PDF i n'extreu la metadata. Retorna (text net, metadata)"""
+    clean_text = text_cleaner.clean(markdown)
+    file_metadata = metadata_extractor.extract_from_file(pdf_path)
+    text_metadata = metadata_extractor.extract_from_text(clean_text)
+    return clean_text, {**file_metadata, **text_metadata}
+
+
+# Components propis de cada procés worker (els crea _init_pdf_worker)
+_worker_components: Optional[Tuple[PDFToMarkdownConverter, TextCleaner, MetadataExtractor]] = None
+
+
+def _init_pdf_worker():
+    """Inicialitzador del Pool: cada procés té els seus propis components"""
+    global _worker_components
+    
+    # El QueueListener només viu al procés principal: els workers escriuen directament
+    logging.getLogger().handlers = list(_log_handlers)
+    
+    _worker_components = _make_ingestion_components()
+
+
+def _process_pdf_worker(
+    pdf_path: str
+) -> Tuple[str, Optional[str], Optional[Dict[str, Any]], Optional[str]]:
+    """
+    Processa un PDF dins d'un worker
+    
+    Returns:
+        (pdf_path, text net, metadata, error); en cas d'error text i metadata són None
+    """
+    try:
+        clean_text, metadata = _convert_pdf(*_worker_components, pdf_path)
+        return pdf_path, clean_text, metadata, None
+    except Exception as e:
+        return pdf_path, None, None, str(e)
+
 
 class CompletePipeline:
     """
@@ -59,7 +146,9 @@ class CompletePipeline:
         vector_store_backend: str = "chroma",
         embedding_model: str = "bge-m3",
         chunking_strategy: str = "sentence",
-        chunk_size: int = 512
+        chunk_size: int = 512,
+        workers: int = 1,
+        from_docstore: bool = False
     ):
         """
         Inicialitza el pipeline complet
@@ -71,6 +160,8 @@ class CompletePipeline:
             embedding_model: Model d'embeddings
             chunking_strategy: Estratègia de chunking
             chunk_size: Mida dels chunks
+            workers: Processos per convertir PDFs en paral·lel (1 = seqüencial)
+            from_docstore: Indexar tot el DocStore existent en lloc de processar PDFs
         """
         self.pdf_dir = Path(pdf_dir)
         self.docstore_path = docstore_path
@@ -78,6 +169,8 @@ class CompletePipeline:
         self.embedding_model = embedding_model
         self.chunking_strategy = chunking_strategy
         self.chunk_size = chunk_size
+        self.workers = max(1, workers)
+        self.from_docstore = from_docstore
         
         # Components Mòdul 1
         self.pdf_converter = None
@@ -108,15 +201,7 @@ class CompletePipeline:
         
         # Mòdul 1
         logger.info("📦 Mòdul 1: Ingestion...")
-        self.pdf_converter = PDFToMarkdownConverter(
-            extract_images=True,
-            image_path="data/images"
-        )
-        self.text_cleaner = TextCleaner(
-            remove_extra_whitespace=True,
-            normalize_unicode=True
-        )
-        self.metadata_extractor = MetadataExtractor()
+        self.pdf_converter, self.text_cleaner, self.metadata_extractor = _make_ingestion_components()
         self.validator = DocumentValidator(min_text_length=100)
         self.docstore = DocumentStoreManager(
             backend='simple',
@@ -135,7 +220,12 @@ class CompletePipeline:
         try:
             self.embedder = EmbeddingGenerator(
                 model_name=self.embedding_model,
-                batch_size=50
+                batch_size=50,
+                # Batches per volum de text (~4 caràcters per token):
+                # l'equivalent a 50 chunks complets
+                max_batch_chars=50 * self.chunk_size * 4,
+                # Embeddings de chunks ja vistos en execucions anteriors
+                cache_path='data/indexes/embed_cache'
             )
             logger.info(f"  ✓ Embedding model: {self.embedding_model}")
         except Exception as e:
@@ -160,10 +250,16 @@ class CompletePipeline:
         logger.info("PAS 2: PROCESSANT PDFs (MÒDUL 1)")
         logger.info("="*70)
         
-        start_time = datetime.now()
+        start_time = time.perf_counter()
         
-        # Buscar PDFs
-        pdf_files = list(self.pdf_dir.glob("*.pdf"))
+        # Buscar PDFs (una sola passada pel directori; DirEntry ja porta el tipus)
+        pdf_files = []
+        if self.pdf_dir.is_dir():
+            with os.scandir(self.pdf_dir) as entries:
+                pdf_files = [
+                    Path(entry.path) for entry in entries
+                    if entry.is_file() and entry.name.lower().endswith(".pdf")
+                ]
         
         if not pdf_files:
             logger.warning(f"No s'han trobat PDFs a: {self.pdf_dir}")
@@ -173,54 +269,27 @@ class CompletePipeline:
         logger.info(f"📄 PDFs trobats: {len(pdf_files)}")
         
         processed_docs = []
+        pdf_paths = [str(pdf_file) for pdf_file in pdf_files]
+        
+        if self.workers > 1:
+            # Conversió + neteja + metadata en processos separats; validació
+            # (detecció de duplicats) i DocStore es queden al procés principal
+            logger.info(f"⚙️  Workers: {self.workers}")
+            with Pool(processes=self.workers, initializer=_init_pdf_worker) as pool:
+                results = pool.imap_unordered(_process_pdf_worker, pdf_paths, chunksize=1)
+                self._store_pdf_results(results, len(pdf_paths), processed_docs)
+        else:
+            self._store_pdf_results(
+                self._iter_local_results(pdf_paths), len(pdf_paths), processed_docs
+            )
         
-        for i, pdf_file in enumerate(pdf_files, 1):
-            try:
-                logger.info(f"\n[{i}/{len(pdf_files)}] Processant: {pdf_file.name}")
-                
-                # 1. Convertir PDF → Markdown
-                logger.info("  1/5 Convertint PDF → Markdown...")
-                markdown = self.pdf_converter.convert_file(str(pdf_file))
-                logger.info(f"      ✓ {len(markdown):,} caràcters")
-                
-                # 2. Netejar text
-                logger.info("  2/5 Netejant text...")
-                clean_text = self.text_cleaner.clean(markdown)
-                logger.info(f"      ✓ {len(clean_text):,} caràcters")
-                
-                # 3. Extreure metadata
-                logger.info("  3/5 Extraient metadata...")
-                file_metadata = self.metadata_extractor.extract_from_file(str(pdf_file))
-                text_metadata = self.metadata_extractor.extract_from_text(clean_text)
-                metadata = {**file_metadata, **text_metadata}
-                logger.info(f"      ✓ {len(metadata)} camps")
-                
-                # 4. Crear document
-                doc = Document(text=clean_text, metadata=metadata)
-                
-                # 5. Validar
-                logger.info("  4/5 Validant...")
-                self.validator.validate(doc)
-                logger.info("      ✓ Vàlid")
-                
-                # 6. Guardar al DocStore
-                logger.info("  5/5 Guardant al DocStore...")
-                self.docstore.add_documents([doc])
-                logger.info("      ✓ Guardat")
-                
-                processed_docs.append(doc)
-                
-            except Exception as e:
-                logger.error(f"  ✗ Error processant {pdf_file.name}: {e}")
-                continue
-        
-        elapsed = (datetime.now() - start_time).total_seconds()
+        elapsed = time.perf_counter() - start_time
         
         logger.info(f"\n{'='*70}")
         logger.info(f"MÒDUL 1 COMPLETAT:")
         logger.info(f"  • PDFs processats: {len(processed_docs)}/{len(pdf_files)}")
         logger.info(f"  • Temps: {elapsed:.1f}s")
-        logger.info(f"  • Documents al DocStore: {len(self.docstore.get_all_documents())}")
+        logger.info(f"  • Documents al DocStore: {self.docstore.count_documents()}")
         logger.info(f"{'='*70}")
         
         self.stats['module1'] = {
@@ -231,6 +300,82 @@ class CompletePipeline:
         
         return processed_docs
     
+    def _iter_local_results(self, pdf_paths: List[str]):
+        """
+        Processa els PDFs al procés principal amb el mateix format de resultat
+        que _process_pdf_worker. La conversió del PDF següent es llança en un
+        fil mentre l'actual es neteja, es valida i es guarda.
+        """
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(self.pdf_converter.convert_file, pdf_paths[0])
+            
+            for i, pdf_path in enumerate(pdf_paths):
+                try:
+                    markdown = future.result()
+                    error = None
+                except Exception as e:
+                    markdown = None
+                    error = str(e)
+                
+                # Prefetch: convertir el següent abans de tractar l'actual
+                if i + 1 < len(pdf_paths):
+                    future = executor.submit(self.pdf_converter.convert_file, pdf_paths[i + 1])
+                
+                if error is not None:
+                    yield pdf_path, None, None, error
+                    continue
+                
+                try:
+                    clean_text, metadata = _clean_and_extract(
+                        self.text_cleaner, self.metadata_extractor, pdf_path, markdown
+                    )
+                except Exception as e:
+                    yield pdf_path, None, None, str(e)
+                    continue
+                
+                yield pdf_path, clean_text, metadata, None
+    
+    def _store_pdf_results(self, results, total: int, processed_docs: list):
+        """Valida i guarda al DocStore els resultats (pdf_path, text, metadata, error)"""
+        pending = []
+        
+        for i, (pdf_path, clean_text, metadata, error) in enumerate(results, 1):
+            name = Path(pdf_path).name
+            
+            if error is not None:
+                logger.error(f"  ✗ Error processant {name}: {error}")
+                continue
+            
+            try:
+                logger.info(
+                    f"[{i}/{total}] {name}: {len(clean_text):,} caràcters, {len(metadata)} camps"
+                )
+                
+                doc = Document(text=clean_text, metadata=metadata)
+                self.validator.validate(doc)
+                pending.append(doc)
+                
+            except Exception as e:
+                logger.error(f"  ✗ Error processant {name}: {e}")
+                continue
+            
+            if len(pending) >= _DOCSTORE_FLUSH_EVERY:
+                self._flush_to_docstore(pending, processed_docs)
+        
+        if pending:
+            self._flush_to_docstore(pending, processed_docs)
+    
+    def _flush_to_docstore(self, pending: list, processed_docs: list):
+        """Guarda els documents pendents amb un sol add_documents i buida la llista"""
+        try:
+            results = self.docstore.add_documents(pending)
+            failed = {error['doc_id'] for error in results['errors']}
+            processed_docs.extend(doc for doc in pending if doc.doc_id not in failed)
+        except Exception as e:
+            logger.error(f"  ✗ Error guardant {len(pending)} documents al DocStore: {e}")
+        finally:
+            pending.clear()
+    
     def step3_load_from_docstore(self):
         """Pas 3: Carregar documents del DocStore"""
         logger.info("\n" + "="*70)
@@ -255,14 +400,14 @@ class CompletePipeline:
         logger.info("PAS 4: CHUNKING (MÒDUL 2)")
         logger.info("="*70)
         
-        start_time = datetime.now()
+        start_time = time.perf_counter()
         
         logger.info(f"🔪 Estratègia: {self.chunking_strategy}")
         logger.info(f"   Chunk size: {self.chunk_size}")
         
         nodes = self.chunker.chunk_documents(documents, show_progress=True)
         
-        elapsed = (datetime.now() - start_time).total_seconds()
+        elapsed = time.perf_counter() - start_time
         
         # Estadístiques
         stats = self.chunker.get_statistics(nodes)
@@ -280,15 +425,15 @@ class CompletePipeline:
         logger.info("PAS 5: GENERANT EMBEDDINGS (MÒDUL 2)")
         logger.info("="*70)
         
-        start_time = datetime.now()
+        start_time = time.perf_counter()
         
         logger.info(f"🤖 Model: {self.embedding_model}")
         logger.info(f"   Dimensions: {self.embedder.dimensions}")
         logger.info(f"   Multilingüe: {self.embedder.is_multilingual}")
         
-        nodes = self.embedder.embed_nodes(nodes, show_progress=True)
+        nodes = self.embedder.embed_nodes(nodes, show_progress=True, sort_by_length=True)
         
-        elapsed = (datetime.now() - start_time).total_seconds()
+        elapsed = time.perf_counter() - start_time
         
         logger.info(f"\n✓ Embeddings generats: {len(nodes)}")
         logger.info(f"  • Temps: {elapsed:.1f}s")
@@ -302,7 +447,21 @@ class CompletePipeline:
         logger.info("PAS 6: CONSTRUINT ÍNDEX VECTORIAL (MÒDUL 2)")
         logger.info("="*70)
         
-        start_time = datetime.now()
+        start_time = time.perf_counter()
+        
+        # Backends quantitzats (faiss-ivfpq, faiss-sq8): entrenar abans d'afegir vectors.
+        # Si no hi ha prou vectors, es continua amb un índex FAISS exacte.
+        try:
+            self.vector_store.train_index([node.embedding for node in nodes])
+        except ValueError as e:
+            logger.warning(f"⚠️  No es pot entrenar '{self.vector_store_backend}': {e}")
+            logger.warning("   Es fa servir 'faiss' (índex exacte, sense quantitzar)")
+            self.vector_store_backend = 'faiss'
+            self.vector_store = VectorStoreManager(
+                backend='faiss',
+                collection_name='rag_documents',
+                dimension=self.embedder.dimensions
+            )
         
         # Crear index builder
         self.index_builder = IndexBuilder(
@@ -319,12 +478,15 @@ class CompletePipeline:
         logger.info("📋 Indexant metadata...")
         self.metadata_index.index_nodes(nodes)
         
-        # Persistir
+        # Persistir (índex i metadata van a paths diferents: en paral·lel)
         logger.info("💾 Persistint...")
-        self.index_builder.persist()
-        self.metadata_index.persist()
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            index_future = executor.submit(self.index_builder.persist)
+            metadata_future = executor.submit(self.metadata_index.persist)
+            index_future.result()
+            metadata_future.result()
         
-        elapsed = (datetime.now() - start_time).total_seconds()
+        elapsed = time.perf_counter() - start_time
         
         logger.info(f"\n✓ Índex construït correctament")
         logger.info(f"  • Temps: {elapsed:.1f}s")
@@ -367,25 +529,26 @@ class CompletePipeline:
         logger.info("   PIPELINE COMPLET: MÒDUL 1 + MÒDUL 2")
         logger.info("="*70 + "\n")
         
-        total_start = datetime.now()
+        total_start = time.perf_counter()
         
         try:
             # Pas 1: Inicialitzar
             self.step1_initialize_components()
             
-            # Pas 2: Processar PDFs (Mòdul 1)
-            processed_docs = self.step2_process_pdfs()
-            
-            if not processed_docs:
-                logger.warning("No hi ha documents per processar")
-                return
-            
-            # Pas 3: Carregar del DocStore
-            documents = self.step3_load_from_docstore()
-            
-            if not documents:
-                logger.error("No s'han pogut carregar documents del DocStore")
-                return
+            if self.from_docstore:
+                # Pas 3: Carregar del DocStore (indexar el que ja hi ha)
+                documents = self.step3_load_from_docstore()
+                
+                if not documents:
+                    logger.error("No s'han pogut carregar documents del DocStore")
+                    return
+            else:
+                # Pas 2: Processar PDFs (Mòdul 1); els documents ja són en memòria
+                documents = self.step2_process_pdfs()
+                
+                if not documents:
+                    logger.warning("No hi ha documents per processar")
+                    return
             
             # Pas 4: Chunking (Mòdul 2)
             nodes = self.step4_chunking(documents)
@@ -400,7 +563,7 @@ class CompletePipeline:
             self.step7_test_queries(index)
             
             # Resum final
-            total_elapsed = (datetime.now() - total_start).total_seconds()
+            total_elapsed = time.perf_counter() - total_start
             
             logger.info("\n" + "="*70)
             logger.info("✅ PIPELINE COMPLET FINALITZAT")
@@ -436,6 +599,10 @@ def main():
     parser.add_argument('--embedding-model', default='bge-m3', help='Model d\'embeddings')
     parser.add_argument('--vector-store', default='chroma', help='Vector store backend')
     parser.add_argument('--chunk-size', type=int, default=512, help='Mida dels chunks')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Processos per convertir PDFs en paral·lel (1 = seqüencial)')
+    parser.add_argument('--from-docstore', action='store_true',
+                        help='Indexar els documents del DocStore existent sense processar PDFs')
     
     args = parser.parse_args()
     
@@ -444,7 +611,9 @@ def main():
         pdf_dir=args.pdf_dir,
         embedding_model=args.embedding_model,
         vector_store_backend=args.vector_store,
-        chunk_size=args.chunk_size
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+        from_docstore=args.from_docstore
     )
     
     pipeline.run()
@@ -4,26 +4,176 @@
 Gestiona l'emmagatzematge persistent dels documents amb actualitzacions incrementals
 """
 
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Set
 from pathlib import Path
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import lru_cache
+from itertools import count
 from datetime import datetime
 import json
+import os
+import sqlite3
+import threading
 import logging
 
 from llama_index.core import Document
 from llama_index.core.storage.docstore import SimpleDocumentStore
+from llama_index.core.storage.docstore.keyval_docstore import KVDocumentStore
+from llama_index.core.storage.kvstore.types import BaseKVStore, DEFAULT_COLLECTION
+
+# orjson (opcional) per (de)serialitzar els JSON propis molt més ràpid
+try:
+    import orjson  # type: ignore
+    _ORJSON_AVAILABLE = True
+except Exception:
+    orjson = None
+    _ORJSON_AVAILABLE = False
 # from llama_index.storage.docstore.mongodb import MongoDocumentStore
 # from llama_index.storage.docstore.redis import RedisDocumentStore
 
 logger = logging.getLogger(__name__)
 
 
+def _json_dumps(obj: Any) -> bytes:
+    """Serialitza a JSON (UTF-8, indentat) amb orjson si està disponible"""
+    if _ORJSON_AVAILABLE:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+
+
+def _json_loads(data: bytes) -> Any:
+    """Deserialitza JSON amb orjson si està disponible"""
+    if _ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _write_synced(tmp_file: Path, data: bytes):
+    """Escriu data a tmp_file i el força a disc (flush + fsync amb el mateix handle)"""
+    with open(tmp_file, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _replace_atomically(tmp_file: Path, target_file: Path, synced: bool = False):
+    """
+    Substitueix target_file per tmp_file de forma atòmica: un tall a mig
+    escriure deixa la versió anterior intacta, mai un fitxer a mitges
+    
+    Args:
+        tmp_file: Fitxer temporal ja escrit (mateix directori que target_file)
+        target_file: Fitxer final
+        synced: El fitxer ja s'ha forçat a disc (_write_synced)
+    """
+    if not synced:
+        # Escrit per una altra llibreria: cal un handle d'escriptura per fer
+        # fsync (a Windows, fsync sobre un handle només de lectura falla)
+        with open(tmp_file, 'r+b') as f:
+            os.fsync(f.fileno())
+    
+    os.replace(tmp_file, target_file)
+    
+    # Assegurar que el rename queda registrat al directori (POSIX)
+    if hasattr(os, 'O_DIRECTORY'):
+        dir_fd = os.open(target_file.parent, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+class SQLiteKVStore(BaseKVStore):
+    """
+    Magatzem clau-valor sobre SQLite per al backend 'sqlite' del docstore.
+    Cada escriptura és una transacció sobre les files afectades (no es
+    reescriu tot el docstore com amb SimpleDocumentStore)
+    """
+    
+    def __init__(self, db_path: str):
+        """
+        Args:
+            db_path: Fitxer de la base de dades SQLite
+        """
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS kv ("
+            "collection TEXT NOT NULL, key TEXT NOT NULL, val TEXT NOT NULL, "
+            "PRIMARY KEY (collection, key)) WITHOUT ROWID"
+        )
+        self._conn.commit()
+    
+    def put(self, key: str, val: dict, collection: str = DEFAULT_COLLECTION) -> None:
+        self.put_all([(key, val)], collection=collection)
+    
+    async def aput(self, key: str, val: dict, collection: str = DEFAULT_COLLECTION) -> None:
+        self.put(key, val, collection=collection)
+    
+    def put_all(self, kv_pairs, collection: str = DEFAULT_COLLECTION, batch_size: int = 1) -> None:
+        """Escriu totes les parelles en una sola transacció (batch_size s'ignora)"""
+        rows = [(collection, key, json.dumps(val)) for key, val in kv_pairs]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO kv (collection, key, val) VALUES (?, ?, ?)",
+                rows
+            )
+    
+    async def aput_all(self, kv_pairs, collection: str = DEFAULT_COLLECTION, batch_size: int = 1) -> None:
+        self.put_all(kv_pairs, collection=collection)
+    
+    def get(self, key: str, collection: str = DEFAULT_COLLECTION) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT val FROM kv WHERE collection = ? AND key = ?",
+                (collection, key)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+    
+    async def aget(self, key: str, collection: str = DEFAULT_COLLECTION) -> Optional[dict]:
+        return self.get(key, collection=collection)
+    
+    def get_all(self, collection: str = DEFAULT_COLLECTION) -> Dict[str, dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, val FROM kv WHERE collection = ?", (collection,)
+            ).fetchall()
+        return {key: json.loads(val) for key, val in rows}
+    
+    async def aget_all(self, collection: str = DEFAULT_COLLECTION) -> Dict[str, dict]:
+        return self.get_all(collection=collection)
+    
+    def delete(self, key: str, collection: str = DEFAULT_COLLECTION) -> bool:
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "DELETE FROM kv WHERE collection = ? AND key = ?",
+                (collection, key)
+            )
+        return cursor.rowcount > 0
+    
+    async def adelete(self, key: str, collection: str = DEFAULT_COLLECTION) -> bool:
+        return self.delete(key, collection=collection)
+
+
+def _is_hashable(value: Any) -> bool:
+    """Indica si un valor de metadada es pot indexar (clau de diccionari)"""
+    try:
+        hash(value)
+        return True
+    except TypeError:
+        return False
+
+
 class DocumentStoreManager:
     """
     Gestor de persistència de documents amb suport per múltiples backends
     """
     
-    SUPPORTED_BACKENDS = ['simple', 'mongodb', 'redis', 'json']
+    SUPPORTED_BACKENDS = ['simple', 'sqlite', 'mongodb', 'redis', 'json']
     
     def __init__(
         self,
@@ -35,7 +185,7 @@ class DocumentStoreManager:
         Inicialitza el gestor de docstore
         
         Args:
-            backend: Tipus de backend ('simple', 'mongodb', 'redis', 'json')
+            backend: Tipus de backend ('simple', 'sqlite', 'mongodb', 'redis', 'json')
             persist_path: Path per persistir dades
             **backend_kwargs: Arguments específics del backend
         """
@@ -45,6 +195,23 @@ class DocumentStoreManager:
         
         self.docstore = self._init_docstore(backend, **backend_kwargs)
         self.metadata_index = {}  # Índex addicional per metadades
+        # Índex invertit camp -> valor -> {doc_id} (es reconstrueix a partir de metadata_index)
+        self.metadata_postings: Dict[str, Dict[Any, Set[str]]] = defaultdict(lambda: defaultdict(set))
+        # Número d'ordre d'inserció de cada document (no canvia en actualitzar-lo)
+        self._doc_seq: Dict[str, int] = {}
+        self._seq_counter = count()
+        
+        # Persistència ajornada (veure defer_persist)
+        self._persist_depth = 0
+        self._persist_pending = False
+        
+        # Longitud del text per document i total, per a get_statistics
+        # (es calculen al primer get_statistics i després es mantenen)
+        self._doc_chars: Optional[Dict[str, int]] = None
+        self._total_chars = 0
+        
+        # Resultat de get_statistics; es descarta (None) quan canvien documents o metadades
+        self._stats_cache: Optional[Dict[str, Any]] = None
         
         # Carregar metadata index si existeix
         self._load_metadata_index()
@@ -60,6 +227,11 @@ class DocumentStoreManager:
                 str(docstore_file)
             ) if docstore_file.exists() else SimpleDocumentStore()
         
+        elif backend == 'sqlite':
+            # Escriptures incrementals: només les files dels documents nous
+            db_file = self.persist_path / "docstore.db"
+            return KVDocumentStore(SQLiteKVStore(str(db_file)))
+        
         elif backend == 'mongodb':
             mongo_uri = kwargs.get('mongo_uri', 'mongodb://localhost:27017')
             db_name = kwargs.get('db_name', 'rag_system')
@@ -105,29 +277,38 @@ class DocumentStoreManager:
             'errors': []
         }
         
+        timestamp = datetime.now().isoformat()
+        pending = []  # (document, existia) a guardar en bloc
+        
         for doc in documents:
             try:
                 # Verificar si ja existeix
-                existing = self.get_document(doc.doc_id)
+                existing = self._document_exists(doc.doc_id)
                 
                 if existing and not update_existing:
                     results['skipped'] += 1
-                    logger.debug(f"Document saltat (existeix): {doc.doc_id}")
+                    logger.debug("Document saltat (existeix): %s", doc.doc_id)
                     continue
                 
                 # Afegir timestamp
-                doc.metadata['stored_at'] = datetime.now().isoformat()
+                doc.metadata['stored_at'] = timestamp
                 if existing:
-                    doc.metadata['updated_at'] = datetime.now().isoformat()
+                    doc.metadata['updated_at'] = timestamp
                 
-                # Guardar al docstore
-                if self.backend == 'json':
-                    self._save_json_document(doc)
-                else:
-                    self.docstore.add_documents([doc])
+                pending.append((doc, existing))
                 
+            except Exception as e:
+                results['errors'].append({
+                    'doc_id': doc.doc_id,
+                    'error': str(e)
+                })
+                logger.error(f"Error guardant document {doc.doc_id}: {e}")
+        
+        with self.defer_persist():
+            for doc, existing in self._store_documents(pending, results):
                 # Actualitzar índex de metadata
                 self._update_metadata_index(doc)
+                self._track_doc_chars(doc.doc_id, len(doc.text))
                 
                 if existing:
                     results['updated'] += 1
@@ -135,16 +316,9 @@ class DocumentStoreManager:
                 else:
                     results['added'] += 1
                     logger.info(f"Document afegit: {doc.doc_id}")
-                
-            except Exception as e:
-                results['errors'].append({
-                    'doc_id': doc.doc_id,
-                    'error': str(e)
-                })
-                logger.error(f"Error guardant document {doc.doc_id}: {e}")
-        
-        # Persistir
-        self.persist()
+            
+            # Persistir (un sol cop, en sortir del bloc)
+            self.persist()
         
         logger.info(
             f"Documents guardats: {results['added']} nous, "
@@ -153,6 +327,68 @@ class DocumentStoreManager:
         
         return results
     
+    def _store_documents(
+        self,
+        pending: List[tuple],
+        results: Dict[str, Any]
+    ) -> List[tuple]:
+        """
+        Guarda els documents pendents amb una sola crida al backend
+        
+        Args:
+            pending: Llista de (document, existia)
+            results: Resultats on registrar errors
+            
+        Returns:
+            Llista de (document, existia) guardats correctament
+        """
+        if not pending:
+            return []
+        
+        if self.backend != 'json':
+            try:
+                self.docstore.add_documents([doc for doc, _ in pending])
+                return pending
+            except Exception as e:
+                logger.warning(f"Error en l'escriptura en bloc, reintentant document a document: {e}")
+        
+        stored = []
+        for doc, existing in pending:
+            try:
+                if self.backend == 'json':
+                    self._save_json_document(doc)
+                else:
+                    self.docstore.add_documents([doc])
+                stored.append((doc, existing))
+            except Exception as e:
+                results['errors'].append({
+                    'doc_id': doc.doc_id,
+                    'error': str(e)
+                })
+                logger.error(f"Error guardant document {doc.doc_id}: {e}")
+        
+        return stored
+    
+    def _document_exists(self, doc_id: str) -> bool:
+        """Comprova si un document existeix sense deserialitzar-lo"""
+        if self.backend == 'json':
+            return (self.persist_path / f"{doc_id}.json").exists()
+        return self.docstore.document_exists(doc_id)
+    
+    @contextmanager
+    def defer_persist(self):
+        """
+        Agrupa operacions: les crides a persist() dins del bloc s'ajornen
+        i es persisteix un sol cop en sortir-ne
+        """
+        self._persist_depth += 1
+        try:
+            yield self
+        finally:
+            self._persist_depth -= 1
+            if self._persist_depth == 0 and self._persist_pending:
+                self.persist()
+    
     def get_document(self, doc_id: str) -> Optional[Document]:
         """
         Obté un document per ID
@@ -171,6 +407,24 @@ class DocumentStoreManager:
         except:
             return None
     
+    def get_documents(self, doc_ids: List[str]) -> List[Document]:
+        """
+        Obté diversos documents per ID en una sola passada
+        
+        Args:
+            doc_ids: Llista d'IDs
+            
+        Returns:
+            Llista de documents trobats (s'ometen els inexistents)
+        """
+        if self.backend == 'json':
+            docs = map(self._load_json_document, doc_ids)
+        else:
+            get = self.docstore.get_document
+            docs = (get(doc_id, raise_error=False) for doc_id in doc_ids)
+        
+        return [doc for doc in docs if doc]
+    
     def get_all_documents(self) -> List[Document]:
         """
         Obté tots els documents
@@ -201,8 +455,8 @@ class DocumentStoreManager:
                 self.docstore.delete_document(doc_id)
             
             # Actualitzar metadata index
-            if doc_id in self.metadata_index:
-                del self.metadata_index[doc_id]
+            self._remove_from_metadata_index(doc_id)
+            self._track_doc_chars(doc_id, None)
             
             self.persist()
             logger.info(f"Document esborrat: {doc_id}")
@@ -227,7 +481,58 @@ class DocumentStoreManager:
         Returns:
             Llista de documents que coincideixen
         """
-        matching_docs = []
+        doc_ids = self.find_document_ids(filters, match_all)
+        
+        # Ordre d'inserció (no el del conjunt), ordenant només les coincidències
+        ordered_ids = sorted(doc_ids, key=self._doc_seq.__getitem__)
+        matching_docs = self.get_documents(ordered_ids)
+        
+        logger.info(f"Cerca per metadata: {len(matching_docs)} documents trobats")
+        return matching_docs
+    
+    def find_document_ids(
+        self,
+        filters: Dict[str, Any],
+        match_all: bool = True
+    ) -> Set[str]:
+        """
+        Resol els filtres a IDs de documents amb l'índex invertit
+        
+        Args:
+            filters: Diccionari de filtres {key: value}
+            match_all: Intersecció (True) o unió (False) dels filtres
+            
+        Returns:
+            Conjunt d'IDs que coincideixen
+        """
+        if not filters:
+            return set(self.metadata_index) if match_all else set()
+        
+        postings = []
+        for key, value in filters.items():
+            values = value if isinstance(value, list) else [value]
+            
+            # Valors no indexables: recorregut lineal com abans
+            if not all(_is_hashable(v) for v in values):
+                return self._scan_metadata_index(filters, match_all)
+            
+            field_postings = self.metadata_postings.get(key, {})
+            ids = set()
+            for v in values:
+                ids.update(field_postings.get(v, ()))
+            postings.append(ids)
+        
+        if match_all:
+            return set.intersection(*postings)
+        return set.union(*postings)
+    
+    def _scan_metadata_index(
+        self,
+        filters: Dict[str, Any],
+        match_all: bool
+    ) -> Set[str]:
+        """Resol els filtres recorrent tot el metadata index"""
+        doc_ids = set()
         
         for doc_id, metadata in self.metadata_index.items():
             matches = []
@@ -242,16 +547,20 @@ class DocumentStoreManager:
                     matches.append(False)
             
             if match_all and all(matches):
-                doc = self.get_document(doc_id)
-                if doc:
-                    matching_docs.append(doc)
+                doc_ids.add(doc_id)
             elif not match_all and any(matches):
-                doc = self.get_document(doc_id)
-                if doc:
-                    matching_docs.append(doc)
+                doc_ids.add(doc_id)
         
-        logger.info(f"Cerca per metadata: {len(matching_docs)} documents trobats")
-        return matching_docs
+        return doc_ids
+    
+    def count_documents(self) -> int:
+        """
+        Nombre de documents guardats, sense carregar-los (a partir del metadata index)
+        
+        Returns:
+            Nombre de documents
+        """
+        return len(self.metadata_index)
     
     def get_statistics(self) -> Dict[str, Any]:
         """
@@ -260,44 +569,73 @@ class DocumentStoreManager:
         Returns:
             Diccionari amb estadístiques
         """
-        docs = self.get_all_documents()
+        if self._stats_cache is not None:
+            return dict(self._stats_cache)
         
-        if not docs:
-            return {
+        if self._doc_chars is None:
+            self._doc_chars = {
+                doc.doc_id: len(doc.text) for doc in self.get_all_documents()
+            }
+            self._total_chars = sum(self._doc_chars.values())
+        
+        total_documents = len(self._doc_chars)
+        
+        if not total_documents:
+            stats = {
                 'total_documents': 0,
                 'total_chars': 0,
                 'avg_chars': 0
             }
+        else:
+            stats = {
+                'total_documents': total_documents,
+                'total_chars': self._total_chars,
+                'avg_chars': self._total_chars // total_documents,
+                'by_file_type': self._count_by_metadata('file_type'),
+                'by_language': self._count_by_metadata('language')
+            }
         
-        total_chars = sum(len(doc.text) for doc in docs)
+        self._stats_cache = stats
+        return dict(stats)
+    
+    def _count_by_metadata(self, key: str) -> Dict[Any, int]:
+        """Compta documents per valor d'una metadada a partir de l'índex invertit"""
+        counts = {
+            value: len(doc_ids)
+            for value, doc_ids in self.metadata_postings.get(key, {}).items()
+        }
         
-        # Estadístiques per tipus de fitxer
-        by_type = {}
-        for doc_id, metadata in self.metadata_index.items():
-            file_type = metadata.get('file_type', 'unknown')
-            by_type[file_type] = by_type.get(file_type, 0) + 1
+        missing = len(self.metadata_index) - sum(counts.values())
+        if missing > 0:
+            counts['unknown'] = counts.get('unknown', 0) + missing
         
-        # Estadístiques per idioma
-        by_language = {}
-        for doc_id, metadata in self.metadata_index.items():
-            lang = metadata.get('language', 'unknown')
-            by_language[lang] = by_language.get(lang, 0) + 1
-        
-        return {
-            'total_documents': len(docs),
-            'total_chars': total_chars,
-            'avg_chars': total_chars // len(docs),
-            'by_file_type': by_type,
-            'by_language': by_language
-        }
+        return counts
+    
+    def _track_doc_chars(self, doc_id: str, length: Optional[int]):
+        """Actualitza els comptadors de caràcters (length=None en esborrar)"""
+        self._stats_cache = None
+        if self._doc_chars is None:
+            return
+        
+        self._total_chars -= self._doc_chars.pop(doc_id, 0)
+        if length is not None:
+            self._doc_chars[doc_id] = length
+            self._total_chars += length
     
     def persist(self):
         """Persisteix el docstore a disc"""
+        if self._persist_depth:
+            self._persist_pending = True
+            return
+        
+        self._persist_pending = False
         try:
             if self.backend == 'simple':
                 docstore_file = self.persist_path / "docstore.json"
-                self.docstore.persist(persist_path=str(docstore_file))
-            elif self.backend in ['mongodb', 'redis']:
+                tmp_file = docstore_file.with_name(docstore_file.name + ".tmp")
+                self.docstore.persist(persist_path=str(tmp_file))
+                _replace_atomically(tmp_file, docstore_file)
+            elif self.backend in ['sqlite', 'mongodb', 'redis']:
                 pass  # Ja persisteixen automàticament
             elif self.backend == 'json':
                 pass  # Ja guardem a cada operació
@@ -312,21 +650,58 @@ class DocumentStoreManager:
     
     def _update_metadata_index(self, doc: Document):
         """Actualitza l'índex de metadata"""
+        self._stats_cache = None
+        old_metadata = self.metadata_index.get(doc.doc_id)
+        if old_metadata is not None:
+            self._remove_postings(doc.doc_id, old_metadata)
+        else:
+            self._doc_seq[doc.doc_id] = next(self._seq_counter)
+        
+        # Reassignar una clau existent no en canvia la posició (ordre d'inserció estable)
         self.metadata_index[doc.doc_id] = doc.metadata.copy()
+        self._add_postings(doc.doc_id, self.metadata_index[doc.doc_id])
+    
+    def _add_postings(self, doc_id: str, metadata: Dict[str, Any]):
+        """Afegeix un document a l'índex invertit"""
+        for key, value in metadata.items():
+            if _is_hashable(value):
+                self.metadata_postings[key][value].add(doc_id)
+    
+    def _remove_from_metadata_index(self, doc_id: str):
+        """Treu un document del metadata index i de l'índex invertit"""
+        self._stats_cache = None
+        self._doc_seq.pop(doc_id, None)
+        metadata = self.metadata_index.pop(doc_id, None)
+        if metadata:
+            self._remove_postings(doc_id, metadata)
+    
+    def _remove_postings(self, doc_id: str, metadata: Dict[str, Any]):
+        """Treu un document de l'índex invertit"""
+        for key, value in metadata.items():
+            if not _is_hashable(value):
+                continue
+            field_postings = self.metadata_postings.get(key)
+            if field_postings and value in field_postings:
+                field_postings[value].discard(doc_id)
+                if not field_postings[value]:
+                    del field_postings[value]
     
     def _load_metadata_index(self):
         """Carrega l'índex de metadata"""
         index_file = self.persist_path / "metadata_index.json"
         if index_file.exists():
-            with open(index_file, 'r') as f:
-                self.metadata_index = json.load(f)
+            self.metadata_index = _json_loads(index_file.read_bytes())
+            for doc_id, metadata in self.metadata_index.items():
+                self._doc_seq[doc_id] = next(self._seq_counter)
+                self._add_postings(doc_id, metadata)
             logger.debug(f"Metadata index carregat: {len(self.metadata_index)} documents")
     
     def _save_metadata_index(self):
         """Guarda l'índex de metadata"""
         index_file = self.persist_path / "metadata_index.json"
-        with open(index_file, 'w') as f:
-            json.dump(self.metadata_index, f, indent=2)
+        tmp_file = index_file.with_name(index_file.name + ".tmp")
+        _write_synced(tmp_file, _json_dumps(self.metadata_index))
+        _replace_atomically(tmp_file, index_file, synced=True)
     
     # Mètodes per backend JSON custom
     def _save_json_document(self, doc: Document):
@@ -338,8 +713,7 @@ class DocumentStoreManager:
             'metadata': doc.metadata,
             'embedding': doc.embedding
         }
-        with open(doc_file, 'w', encoding='utf-8') as f:
-            json.dump(doc_data, f, indent=2, ensure_ascii=False)
+        doc_file.write_bytes(_json_dumps(doc_data))
     
     def _load_json_document(self, doc_id: str) -> Optional[Document]:
         """Carrega document des de JSON"""
@@ -347,8 +721,7 @@ class DocumentStoreManager:
         if not doc_file.exists():
             return None
         
-        with open(doc_file, 'r', encoding='utf-8') as f:
-            doc_data = json.load(f)
+        doc_data = _json_loads(doc_file.read_bytes())
         
         return Document(
             doc_id=doc_data['doc_id'],
@@ -375,6 +748,25 @@ class DocumentStoreManager:
             doc_file.unlink()
 
 
+@lru_cache(maxsize=8)
+def get_docstore(
+    backend: str = 'simple',
+    persist_path: str = 'data/docstore'
+) -> DocumentStoreManager:
+    """
+    Obté un DocumentStoreManager compartit per (backend, persist_path),
+    de manera que el docstore persistit només es carrega un cop
+    
+    Args:
+        backend: Backend del docstore
+        persist_path: Path de persistència
+        
+    Returns:
+        DocumentStoreManager (mateixa instància per als mateixos arguments)
+    """
+    return DocumentStoreManager(backend=backend, persist_path=persist_path)
+
+
 # Funció helper per integrar amb el pipeline
 def create_persistent_pipeline(
     backend: str = 'simple',
@@ -444,10 +836,20 @@ def process_and_store_documents(
     
     processed_docs = []
     errors = []
+    unchanged = 0
     
     # Processar cada PDF
     for pdf_file in Path(pdf_dir).glob("*.pdf"):
         try:
+            # Sense update_existing, saltar PDFs ja guardats amb el mateix
+            # contingut (evita reconvertir-los)
+            if not update_existing:
+                file_hash = extractor.get_file_hash(str(pdf_file))
+                if docstore_manager.find_document_ids({'file_hash': file_hash}):
+                    unchanged += 1
+                    logger.debug("Sense canvis, saltat: %s", pdf_file.name)
+                    continue
+            
             logger.info(f"Processant: {pdf_file.name}")
             
             # Pipeline
@@ -475,6 +877,7 @@ def process_and_store_documents(
     
     return {
         'processed': len(processed_docs),
+        'unchanged': unchanged,
         'store_results': store_results,
         'errors': errors
     }
\ No newline at end of file
@@ -5,14 +5,42 @@ Extracció i enriquiment de metadades
 """
 
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
+from collections import OrderedDict
 import mimetypes
 import hashlib
+import os
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Entrades màximes de cada cache (LRU) en memòria
+_CACHE_MAXSIZE = 4096
+
+# Hashos ja calculats en aquest procés: (path real, mtime_ns, mida) -> hash
+_hash_cache: "OrderedDict[Tuple[str, int, int], str]" = OrderedDict()
+
+# Metadades de fitxer que només depenen del contingut i la ruta: (path absolut, mtime_ns, mida).
+# No es resolen enllaços simbòlics perquè el nom, l'extensió i el tipus depenen de la ruta
+_file_metadata_cache: "OrderedDict[Tuple[str, int, int], Dict[str, Any]]" = OrderedDict()
+
+
+def _lru_get(cache: OrderedDict, key: Tuple[str, int, int]) -> Any:
+    """Llegeix de la cache i marca l'entrada com a usada recentment"""
+    value = cache.get(key)
+    if value is not None:
+        cache.move_to_end(key)
+    return value
+
+
+def _lru_put(cache: OrderedDict, key: Tuple[str, int, int], value: Any):
+    """Desa a la cache i descarta l'entrada més antiga si se supera _CACHE_MAXSIZE"""
+    cache[key] = value
+    cache.move_to_end(key)
+    if len(cache) > _CACHE_MAXSIZE:
+        cache.popitem(last=False)
+
 
 class MetadataExtractor:
     """
@@ -40,31 +68,92 @@ class MetadataExtractor:
         """
         path = Path(file_path)
         
-        if not path.exists():
+        try:
+            stats = path.stat()
+        except FileNotFoundError:
             raise FileNotFoundError(f"Fitxer no trobat: {file_path}")
         
-        stats = path.stat()
+        # Si el fitxer no ha canviat (mateix path, mtime i mida) es reutilitza
+        key = (os.path.abspath(path), stats.st_mtime_ns, stats.st_size)
+        cached = _lru_get(_file_metadata_cache, key)
         
-        metadata = {
+        if cached is None:
+            cached = self._build_file_metadata(
+                path,
+                source=str(path.absolute()),
+                size=stats.st_size,
+                created_at=datetime.fromtimestamp(stats.st_ctime).isoformat(),
+                modified_at=datetime.fromtimestamp(stats.st_mtime).isoformat(),
+                file_hash=self._get_file_hash(path, stats)
+            )
+            _lru_put(_file_metadata_cache, key, cached)
+        
+        return self._finish_metadata(
+            cached, datetime.fromtimestamp(stats.st_atime).isoformat()
+        )
+    
+    def extract_from_bytes(self, name: str, data: bytes) -> Dict[str, Any]:
+        """
+        Extreu les mateixes metadades que extract_from_file a partir d'un
+        contingut en memòria, sense escriure res a disc
+        
+        Args:
+            name: Nom del fitxer (determina extensió i tipus)
+            data: Contingut del fitxer
+            
+        Returns:
+            Diccionari amb metadades
+        """
+        # El contingut no té dates de sistema de fitxers
+        now = datetime.now().isoformat()
+        
+        file_metadata = self._build_file_metadata(
+            Path(name),
+            source=name,
+            size=len(data),
+            created_at=now,
+            modified_at=now,
+            file_hash=hashlib.md5(data).hexdigest()  # Mateix algoritme que _calculate_hash
+        )
+        
+        return self._finish_metadata(file_metadata, now)
+    
+    def _build_file_metadata(
+        self,
+        path: Path,
+        source: str,
+        size: int,
+        created_at: str,
+        modified_at: str,
+        file_hash: str
+    ) -> Dict[str, Any]:
+        """Metadades de fitxer comunes a extract_from_file i extract_from_bytes"""
+        return {
             # Informació bàsica
             'filename': path.name,
             'file_stem': path.stem,
             'file_extension': path.suffix.lower(),
-            'source': str(path.absolute()),
+            'source': source,
             
             # Tipus i mida
             'file_type': self._get_file_type(path),
             'mime_type': mimetypes.guess_type(str(path))[0],
-            'size_bytes': stats.st_size,
-            'size_mb': round(stats.st_size / (1024 * 1024), 2),
+            'size_bytes': size,
+            'size_mb': round(size / (1024 * 1024), 2),
             
             # Dates
-            'created_at': datetime.fromtimestamp(stats.st_ctime).isoformat(),
-            'modified_at': datetime.fromtimestamp(stats.st_mtime).isoformat(),
-            'accessed_at': datetime.fromtimestamp(stats.st_atime).isoformat(),
+            'created_at': created_at,
+            'modified_at': modified_at,
             
             # Hash per detectar duplicats
-            'file_hash': self._calculate_hash(path),
+            'file_hash': file_hash,
+        }
+    
+    def _finish_metadata(self, file_metadata: Dict[str, Any], accessed_at: str) -> Dict[str, Any]:
+        """Afegeix els camps que canvien a cada crida i els camps personalitzats"""
+        metadata = {
+            **file_metadata,
+            'accessed_at': accessed_at,
             
             # Timestamp d'indexació
             'indexed_at': datetime.now().isoformat(),
@@ -74,7 +163,7 @@ class MetadataExtractor:
         metadata.update(self.custom_fields)
         
         return metadata
-    
+
     def extract_from_text(self, text: str) -> Dict[str, Any]:
         """
         Extreu metadades del contingut del text
@@ -85,11 +174,14 @@ class MetadataExtractor:
         Returns:
             Diccionari amb metadades extretes
         """
+        # Una sola tokenització per al recompte i per detectar l'idioma
+        words = text.split()
+        
         metadata = {
             'text_length': len(text),
-            'word_count': len(text.split()),
-            'line_count': len(text.split('\n')),
-            'language': self._detect_language(text),  # Simplificat
+            'word_count': len(words),
+            'line_count': text.count('\n') + 1,
+            'language': self._detect_language(text, words[:100]),  # Simplificat
         }
         
         return metadata
@@ -112,6 +204,41 @@ class MetadataExtractor:
         
         return type_map.get(ext, 'Unknown')
     
+    def get_file_hash(self, file_path: str) -> str:
+        """
+        Hash del fitxer (el mateix que 'file_hash' a extract_from_file)
+        
+        Args:
+            file_path: Path del fitxer
+            
+        Returns:
+            Hash del fitxer
+        """
+        path = Path(file_path)
+        return self._get_file_hash(path, path.stat())
+    
+    def _get_file_hash(self, path: Path, stats: os.stat_result) -> str:
+        """
+        Obté el hash del fitxer, reutilitzant-lo si el fitxer no ha canviat
+        (mateix path, mtime i mida)
+        
+        Args:
+            path: Path del fitxer
+            stats: Resultat de path.stat()
+            
+        Returns:
+            Hash del fitxer
+        """
+        key = (os.path.realpath(path), stats.st_mtime_ns, stats.st_size)
+        
+        file_hash = _lru_get(_hash_cache, key)
+        if file_hash:
+            return file_hash
+        
+        file_hash = self._calculate_hash(path)
+        _lru_put(_hash_cache, key, file_hash)
+        return file_hash
+    
     def _calculate_hash(self, path: Path, algorithm: str = 'md5') -> str:
         """
         Calcula hash del fitxer per detectar duplicats
@@ -131,17 +258,24 @@ class MetadataExtractor:
         
         return hash_func.hexdigest()
     
-    def _detect_language(self, text: str) -> str:
+    def _detect_language(self, text: str, first_words: Optional[List[str]] = None) -> str:
         """
         Detecta l'idioma del text (versió simplificada)
         Per producció, usar langdetect o similar
+        
+        Args:
+            text: Text a analitzar
+            first_words: Primeres paraules ja separades (si el cridador ja ha partit el text)
         """
         # Heurística simple basada en paraules comunes
         catalan_words = {'amb', 'per', 'que', 'dels', 'una', 'aquesta'}
         spanish_words = {'con', 'por', 'que', 'los', 'una', 'esta'}
         english_words = {'the', 'with', 'for', 'and', 'this', 'that'}
         
-        words = set(text.lower().split()[:100])  # Primeres 100 paraules
+        # Primeres 100 paraules (sense partir ni passar a minúscules tot el text)
+        if first_words is None:
+            first_words = text.split(maxsplit=100)[:100]
+        words = {word.lower() for word in first_words}
         
         cat_score = len(words & catalan_words)
         spa_score = len(words & spanish_words)
@@ -5,9 +5,17 @@ Conversió especialitzada de PDFs a Markdown
 """
 
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterator, Callable
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import os
 import pymupdf4llm
 
+# PyMuPDF (dependència de pymupdf4llm); versions antigues només exposen 'fitz'
+try:
+    import pymupdf
+except ImportError:
+    import fitz as pymupdf
+
 # Optional, improved layout analysis
 try:
     import pymupdf_layout  # type: ignore
@@ -19,6 +27,26 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Nombre de PDFs que es demanen per avançat al kernel mentre es converteix l'actual
+READAHEAD_FILES = 2
+
+
+def _readahead(pdf_file: Path):
+    """
+    Demana al kernel que carregui el fitxer a la page cache en segon pla
+    (posix_fadvise WILLNEED; no bloqueja). Sense efecte on no està disponible.
+    """
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    try:
+        fd = os.open(pdf_file, os.O_RDONLY)
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        finally:
+            os.close(fd)
+    except OSError:
+        pass
+
 
 class PDFToMarkdownConverter:
     """
@@ -134,11 +162,54 @@ class PDFToMarkdownConverter:
             logger.error(f"Error convertint PDF {pdf_path}: {e}")
             raise
     
+    def convert_file_streaming(self, pdf_path: str) -> Iterator[str]:
+        """
+        Converteix un PDF a Markdown pàgina a pàgina, sense tenir tot el
+        document en memòria. El resultat concatenat és el mateix que el de
+        convert_file: si pymupdf_layout està disponible es fa servir
+        convert_file (un sol fragment, l'anàlisi de layout necessita tot el
+        document); si no, pymupdf4llm per pàgines amb els headers
+        detectats un sol cop sobre tot el document.
+        
+        Args:
+            pdf_path: Path del fitxer PDF
+            
+        Yields:
+            Markdown de cada pàgina
+        """
+        path = Path(pdf_path)
+        if not path.exists():
+            raise FileNotFoundError(f"PDF no trobat: {pdf_path}")
+        
+        if _PML_AVAILABLE:
+            yield self.convert_file(pdf_path)
+            return
+        
+        logger.info(f"Convertint PDF (per pàgines): {pdf_path}")
+        
+        kwargs = {
+            'write_images': self.extract_images,
+            'image_path': str(self.image_path) if self.image_path else None,
+            'dpi': self.dpi
+        }
+        
+        with pymupdf.open(str(path)) as doc:
+            # Mateixos nivells de header que una conversió del document sencer
+            identify_headers = getattr(pymupdf4llm, 'IdentifyHeaders', None)
+            if identify_headers is not None:
+                kwargs['hdr_info'] = identify_headers(doc)
+            
+            for page_number in range(doc.page_count):
+                yield pymupdf4llm.to_markdown(doc, pages=[page_number], **kwargs)
+    
     def convert_directory(
         self,
         input_dir: str,
         output_dir: str,
-        add_metadata: bool = True
+        add_metadata: bool = True,
+        max_workers: int = 1,
+        readahead: bool = True,
+        initializer: Optional[Callable[[], None]] = None
     ) -> Dict[str, str]:
         """
         Converteix tots els PDFs d'un directori
@@ -147,6 +218,10 @@ class PDFToMarkdownConverter:
             input_dir: Directori amb PDFs
             output_dir: Directori per Markdowns
             add_metadata: Afegir metadata al principi del MD
+            max_workers: Processos per convertir en paral·lel (1 = seqüencial)
+            readahead: Avançar la lectura de disc dels PDFs següents
+            initializer: Funció que s'executa a l'inici de cada procés worker
+                (p. ex. per configurar el logging del procés)
             
         Returns:
             Diccionari {pdf_name: markdown_path}
@@ -160,32 +235,89 @@ class PDFToMarkdownConverter:
         
         logger.info(f"Convertint {len(pdf_files)} PDFs de {input_dir}")
         
-        for pdf_file in pdf_files:
-            try:
-                # Convertir
-                markdown_text = self.convert_file(str(pdf_file))
-                
-                # Preparar output
-                output_file = output_path / f"{pdf_file.stem}.md"
-                
-                # Afegir metadata si cal
-                if add_metadata:
-                    metadata_header = self._create_metadata_header(pdf_file)
-                    markdown_text = f"{metadata_header}\n\n{markdown_text}"
-                
-                # Guardar
-                output_file.write_text(markdown_text, encoding='utf-8')
-                results[pdf_file.name] = str(output_file)
-                
-                logger.info(f"✓ Convertit: {pdf_file.name} → {output_file.name}")
+        if max_workers > 1 and len(pdf_files) > 1:
+            # Cada PDF és independent: es converteixen en processos separats.
+            # Finestra de lectura anticipada: els PDFs en curs més READAHEAD_FILES
+            # (els workers agafen els PDFs en l'ordre d'enviament)
+            window = max_workers + READAHEAD_FILES
+            if readahead:
+                for pdf_file in pdf_files[:window]:
+                    _readahead(pdf_file)
+            next_readahead = window
+            
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=initializer) as executor:
+                futures = {
+                    executor.submit(self._convert_and_save, pdf_file, output_path, add_metadata): pdf_file
+                    for pdf_file in pdf_files
+                }
+                for future in as_completed(futures):
+                    # Un PDF acabat allibera un worker: s'avança el següent de la cua
+                    if readahead and next_readahead < len(pdf_files):
+                        _readahead(pdf_files[next_readahead])
+                        next_readahead += 1
+                    
+                    pdf_file = futures[future]
+                    try:
+                        output_file = future.result()
+                        results[pdf_file.name] = str(output_file)
+                        logger.info(f"✓ Convertit: {pdf_file.name} → {output_file.name}")
+                    except Exception as e:
+                        logger.error(f"✗ Error amb {pdf_file.name}: {e}")
+        else:
+            if readahead:
+                for pdf_file in pdf_files[:READAHEAD_FILES]:
+                    _readahead(pdf_file)
+            
+            for i, pdf_file in enumerate(pdf_files):
+                # La lectura del següent PDF se solapa amb la conversió de l'actual
+                if readahead and i + READAHEAD_FILES < len(pdf_files):
+                    _readahead(pdf_files[i + READAHEAD_FILES])
                 
-            except Exception as e:
-                logger.error(f"✗ Error amb {pdf_file.name}: {e}")
-                continue
+                try:
+                    output_file = self._convert_and_save(pdf_file, output_path, add_metadata)
+                    results[pdf_file.name] = str(output_file)
+                    
+                    logger.info(f"✓ Convertit: {pdf_file.name} → {output_file.name}")
+                    
+                except Exception as e:
+                    logger.error(f"✗ Error amb {pdf_file.name}: {e}")
+                    continue
         
         logger.info(f"Conversió completada: {len(results)}/{len(pdf_files)} PDFs")
         return results
     
+    def _convert_and_save(
+        self,
+        pdf_file: Path,
+        output_path: Path,
+        add_metadata: bool
+    ) -> Path:
+        """
+        Converteix un PDF i guarda el Markdown resultant
+        
+        Args:
+            pdf_file: Path del PDF
+            output_path: Directori per Markdowns
+            add_metadata: Afegir metadata al principi del MD
+            
+        Returns:
+            Path del fitxer Markdown generat
+        """
+        # Convertir
+        markdown_text = self.convert_file(str(pdf_file))
+        
+        # Preparar output
+        output_file = output_path / f"{pdf_file.stem}.md"
+        
+        # Afegir metadata si cal
+        if add_metadata:
+            metadata_header = self._create_metadata_header(pdf_file)
+            markdown_text = f"{metadata_header}\n\n{markdown_text}"
+        
+        # Guardar
+        output_file.write_text(markdown_text, encoding='utf-8')
+        return output_file
+    
     def _create_metadata_header(self, pdf_path: Path) -> str:
         """Crea capçalera amb metadata del PDF"""
         stats = pdf_path.stat()
@@ -11,6 +11,13 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Patrons precompilats (clean)
+_MULTI_SPACE_RE = re.compile(r' +')
+_BLANK_LINES_RE = re.compile(r'\n\s*\n\s*\n+')
+_PAGE_NUMBER_LINES_RE = re.compile(r'^\s*\d+\s*$', re.MULTILINE)
+_DASH_RUN_RE = re.compile(r'-{5,}')
+_SPECIAL_CHARS_RE = re.compile(r'[^\w\s\-.,;:!?áéíóúàèìòùäëïöüñç]', re.IGNORECASE)
+
 
 class TextCleaner:
     """
@@ -53,32 +60,31 @@ class TextCleaner:
         
         original_length = len(text)
         
-        # Normalitzar Unicode
-        if self.normalize_unicode:
+        # Normalitzar Unicode (el text ASCII ja està en NFKC)
+        if self.normalize_unicode and not text.isascii():
             text = unicodedata.normalize('NFKC', text)
         
         # Eliminar línies massa curtes (probablement artifacts)
-        lines = text.split('\n')
-        lines = [
-            line for line in lines 
-            if len(line.strip()) >= self.min_line_length or line.strip() == ''
-        ]
-        text = '\n'.join(lines)
+        min_length = self.min_line_length
+        text = '\n'.join([
+            line for line in text.split('\n')
+            if (n := len(line.strip())) >= min_length or n == 0
+        ])
         
         # Eliminar espais excessius
         if self.remove_extra_whitespace:
-            text = re.sub(r' +', ' ', text)  # Múltiples espais → 1 espai
-            text = re.sub(r'\n\s*\n\s*\n+', '\n\n', text)  # Múltiples \n → 2 \n
+            text = _MULTI_SPACE_RE.sub(' ', text)  # Múltiples espais → 1 espai
+            text = _BLANK_LINES_RE.sub('\n\n', text)  # Múltiples \n → 2 \n
             text = text.strip()
         
         # Eliminar caràcters especials (opcional, pot perdre informació)
         if self.remove_special_chars:
-            text = re.sub(r'[^\w\s\-.,;:!?áéíóúàèìòùäëïöüñç]', '', text, flags=re.IGNORECASE)
+            text = _SPECIAL_CHARS_RE.sub('', text)
         
         # Netejar patrons comuns de PDFs
         text = self._clean_pdf_artifacts(text)
         
-        logger.debug(f"Text netejat: {original_length} → {len(text)} caràcters")
+        logger.debug("Text netejat: %d → %d caràcters", original_length, len(text))
         
         return text
     
@@ -88,10 +94,10 @@ class TextCleaner:
         # Això es pot millorar amb ML o patrons específics
         
         # Eliminar línies que són només números de pàgina
-        text = re.sub(r'^\s*\d+\s*$', '', text, flags=re.MULTILINE)
+        text = _PAGE_NUMBER_LINES_RE.sub('', text)
         
         # Eliminar separadors de guions excessius
-        text = re.sub(r'-{5,}', '', text)
+        text = _DASH_RUN_RE.sub('', text)
         
         return text
     
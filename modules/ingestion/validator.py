@@ -5,6 +5,7 @@ Validació de qualitat dels documents
 """
 
 from typing import Dict, List, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
 from llama_index.core.schema import Document as LlamaDocument
 import logging
 import hashlib
@@ -42,7 +43,7 @@ class DocumentValidator:
         self.max_text_length = max_text_length
         self.required_metadata = required_metadata or ['filename', 'source']
         self.check_duplicates = check_duplicates
-        self.seen_hashes = set()
+        self.seen_hashes = set()  # Hashos vistos (enters si són hexadecimals, veure _hash_key)
     
     def validate(self, document: LlamaDocument) -> bool:
         """
@@ -57,6 +58,20 @@ class DocumentValidator:
         Raises:
             ValidationError: Si la validació falla
         """
+        errors = self._collect_errors(document)
+        self._finish_validation(document, errors)
+        return True
+    
+    def _collect_errors(self, document: LlamaDocument) -> List[str]:
+        """
+        Comprovacions que no depenen d'altres documents (es poden fer en paral·lel)
+        
+        Args:
+            document: Document a validar
+            
+        Returns:
+            Llista d'errors
+        """
         errors = []
         
         # Normalitzar metadata (afegir alternatives com filename, file_hash)
@@ -74,6 +89,15 @@ class DocumentValidator:
         metadata_errors = self._validate_metadata(document.metadata)
         errors.extend(metadata_errors)
         
+        return errors
+    
+    def _finish_validation(self, document: LlamaDocument, errors: List[str]):
+        """
+        Verifica duplicats (amb estat, sempre seqüencial) i llança l'error si cal
+        
+        Raises:
+            ValidationError: Si hi ha errors
+        """
         # Verificar duplicats
         if self.check_duplicates:
             duplicate_error = self._check_duplicate(document)
@@ -85,13 +109,13 @@ class DocumentValidator:
             logger.warning(f"Document invàlid: {error_msg}")
             raise ValidationError(error_msg)
         
-        logger.debug(f"Document vàlid: {document.metadata.get('filename', 'unknown')}")
-        return True
+        logger.debug("Document vàlid: %s", document.metadata.get('filename', 'unknown'))
     
     def validate_batch(
         self, 
         documents: List[LlamaDocument],
-        stop_on_error: bool = False
+        stop_on_error: bool = False,
+        n_workers: int = 1
     ) -> Dict[str, Any]:
         """
         Valida un lot de documents
@@ -99,6 +123,7 @@ class DocumentValidator:
         Args:
             documents: Llista de documents
             stop_on_error: Aturar en el primer error
+            n_workers: Fils per a les comprovacions independents (1 = seqüencial)
             
         Returns:
             Diccionari amb resultats de validació
@@ -110,9 +135,20 @@ class DocumentValidator:
             'errors': []
         }
         
+        # Les comprovacions sense estat (incloent el sha256 del text, que
+        # allibera el GIL) es fan en paral·lel; els duplicats, en ordre
+        if n_workers > 1 and len(documents) > 1:
+            with ThreadPoolExecutor(max_workers=n_workers) as executor:
+                doc_errors = list(executor.map(self._collect_errors, documents))
+        else:
+            doc_errors = None
+        
         for i, doc in enumerate(documents):
             try:
-                self.validate(doc)
+                if doc_errors is None:
+                    self.validate(doc)
+                else:
+                    self._finish_validation(doc, doc_errors[i])
                 results['valid'] += 1
             except ValidationError as e:
                 results['invalid'] += 1
@@ -135,7 +171,8 @@ class DocumentValidator:
         """Valida el contingut de text"""
         errors = []
         
-        if not text or not text.strip():
+        # isspace() i split(maxsplit=4) eviten copiar o partir tot el text
+        if not text or text.isspace():
             errors.append("Text buit")
             return errors
         
@@ -152,7 +189,7 @@ class DocumentValidator:
             )
         
         # Verificar que no sigui tot caràcters especials
-        if len(text.strip()) > 0 and len(text.split()) < 5:
+        if len(text.split(maxsplit=4)) < 5:
             errors.append("Text sense paraules vàlides")
         
         return errors
@@ -183,11 +220,24 @@ class DocumentValidator:
         if not file_hash:
             return "Hash no disponible per verificar duplicats"
         
-        if file_hash in self.seen_hashes:
+        key = self._hash_key(file_hash)
+        
+        if key in self.seen_hashes:
             return f"Document duplicat (hash: {file_hash[:8]}...)"
         
-        self.seen_hashes.add(file_hash)
+        self.seen_hashes.add(key)
         return None
+    
+    @staticmethod
+    def _hash_key(file_hash: str):
+        """
+        Clau compacta per a seen_hashes: un hash hexadecimal (md5/sha256)
+        es guarda com a enter, que ocupa la meitat que el string
+        """
+        try:
+            return int(file_hash, 16)
+        except (TypeError, ValueError):
+            return file_hash
 
     def _normalize_metadata(self, document: LlamaDocument) -> None:
         """Omple camps derivats a partir de variants de metadata.
@@ -13,6 +13,7 @@ from llama_index.core.node_parser import (
 )
 from llama_index.core.schema import BaseNode, TextNode
 from llama_index.embeddings.openai import OpenAIEmbedding
+import numpy as np
 import logging
 
 logger = logging.getLogger(__name__)
@@ -204,14 +205,19 @@ class ChunkingStrategy:
         if not nodes:
             return {'total_chunks': 0}
         
-        chunk_lengths = [len(node.get_content()) for node in nodes]
+        chunk_lengths = np.fromiter(
+            (len(node.get_content()) for node in nodes),
+            dtype=np.int64,
+            count=len(nodes)
+        )
+        total_characters = int(chunk_lengths.sum())
         
         stats = {
             'total_chunks': len(nodes),
-            'avg_chunk_length': sum(chunk_lengths) / len(chunk_lengths),
-            'min_chunk_length': min(chunk_lengths),
-            'max_chunk_length': max(chunk_lengths),
-            'total_characters': sum(chunk_lengths),
+            'avg_chunk_length': total_characters / len(nodes),
+            'min_chunk_length': int(chunk_lengths.min()),
+            'max_chunk_length': int(chunk_lengths.max()),
+            'total_characters': total_characters,
             'strategy': self.strategy,
             'chunk_size': self.chunk_size,
             'chunk_overlap': self.chunk_overlap
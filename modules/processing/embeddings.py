@@ -4,14 +4,27 @@
 Generación de embeddings con múltiples modelos y proveedores
 """
 
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Iterator
 from llama_index.embeddings.openai import OpenAIEmbedding
 from llama_index.embeddings.huggingface import HuggingFaceEmbedding
 from llama_index.core.schema import BaseNode
+from pathlib import Path
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
 import logging
+import shelve
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
+# Embeddings recientes en memoria, compartidos por todas las instancias
+# (la clave incluye el modelo): clave -> vector float32, en orden de uso.
+# Limitada en bytes (~64k vectores de 1024D); List[float] ocuparía ~8x más
+_EMBEDDING_LRU_MAX_BYTES = 256 * 1024 * 1024
+_embedding_lru: "OrderedDict[str, np.ndarray]" = OrderedDict()
+_embedding_lru_bytes = 0
+
 
 class EmbeddingGenerator:
     """
@@ -110,6 +123,9 @@ class EmbeddingGenerator:
         model_name: str = 'openai-small',
         api_key: Optional[str] = None,
         batch_size: int = 100,
+        cache_path: Optional[str] = None,
+        max_batch_chars: Optional[int] = None,
+        max_in_flight: int = 1,
         **kwargs
     ):
         """
@@ -119,6 +135,13 @@ class EmbeddingGenerator:
             model_name: Nombre del modelo
             api_key: API key (para OpenAI)
             batch_size: Tamaño de batch para generación
+            cache_path: Fichero (shelve) para reutilizar embeddings entre ejecuciones
+            max_batch_chars: Si se indica, los batches se limitan por caracteres
+                totales en lugar de por número de textos (batches grandes de
+                textos cortos y pequeños de textos largos)
+            max_in_flight: Peticiones en curso a la vez (solo proveedores HTTP,
+                p.ej. openai); los modelos locales comparten tokenizer y
+                threads de torch, así que siempre se llaman de uno en uno
             **kwargs: Parámetros adicionales
         """
         if model_name not in self.SUPPORTED_MODELS:
@@ -130,6 +153,19 @@ class EmbeddingGenerator:
         self.model_name = model_name
         self.model_info = self.SUPPORTED_MODELS[model_name]
         self.batch_size = batch_size
+        self.cache_path = cache_path
+        self.max_batch_chars = max_batch_chars
+        self.max_in_flight = max(1, max_in_flight)
+        
+        if self.max_in_flight > 1 and self.model_info['provider'] != 'openai':
+            logger.warning(
+                f"max_in_flight={max_in_flight} ignorado: el modelo local "
+                f"'{model_name}' se llama de uno en uno"
+            )
+            self.max_in_flight = 1
+        
+        if cache_path:
+            Path(cache_path).parent.mkdir(parents=True, exist_ok=True)
         
         self.embed_model = self._initialize_model(api_key, **kwargs)
         
@@ -164,7 +200,8 @@ class EmbeddingGenerator:
     def generate_embeddings(
         self,
         texts: List[str],
-        show_progress: bool = False
+        show_progress: bool = False,
+        sort_by_length: bool = False
     ) -> List[List[float]]:
         """
         Genera embeddings para una lista de textos
@@ -172,6 +209,8 @@ class EmbeddingGenerator:
         Args:
             texts: Lista de textos
             show_progress: Mostrar progreso
+            sort_by_length: Agrupar textos de longitud similar en cada batch
+                (menos padding); el resultado mantiene el orden original
             
         Returns:
             Lista de vectores de embeddings
@@ -180,20 +219,146 @@ class EmbeddingGenerator:
             logger.warning("No hay textos para generar embeddings")
             return []
         
+        return self._generate_cached(texts, show_progress, sort_by_length)
+    
+    def _cache_key(self, text: str) -> str:
+        """Clave de cache: modelo + contenido del texto"""
+        return hashlib.blake2b(
+            f"{self.model_name}\0{text}".encode('utf-8'), digest_size=16
+        ).hexdigest()
+    
+    @staticmethod
+    def _remember(key: str, embedding: List[float]):
+        """Guarda un embedding (como float32) en la LRU en memoria"""
+        global _embedding_lru_bytes
+        
+        if key in _embedding_lru:
+            _embedding_lru.move_to_end(key)
+            return
+        
+        vector = np.asarray(embedding, dtype=np.float32)
+        _embedding_lru[key] = vector
+        _embedding_lru_bytes += vector.nbytes
+        
+        while _embedding_lru_bytes > _EMBEDDING_LRU_MAX_BYTES and _embedding_lru:
+            _, evicted = _embedding_lru.popitem(last=False)
+            _embedding_lru_bytes -= evicted.nbytes
+    
+    @staticmethod
+    def _recall(key: str) -> Optional[List[float]]:
+        """Lee un embedding de la LRU en memoria (como lista), o None"""
+        vector = _embedding_lru.get(key)
+        if vector is None:
+            return None
+        _embedding_lru.move_to_end(key)
+        return vector.tolist()
+    
+    def _generate_cached(
+        self,
+        texts: List[str],
+        show_progress: bool,
+        sort_by_length: bool
+    ) -> List[List[float]]:
+        """
+        Genera embeddings solo para los textos que no están en la cache
+        (LRU en memoria y, si hay cache_path, shelve en disco). Los textos
+        repetidos dentro de la misma llamada se calculan una sola vez.
+        
+        Args:
+            texts: Lista de textos
+            show_progress: Mostrar progreso
+            sort_by_length: Agrupar textos de longitud similar en cada batch
+            
+        Returns:
+            Lista de vectores de embeddings (orden original)
+        """
+        keys = [self._cache_key(text) for text in texts]
+        embeddings: List[Optional[List[float]]] = [self._recall(key) for key in keys]
+        
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        
+        if missing and self.cache_path:
+            try:
+                with shelve.open(self.cache_path) as db:
+                    for i in missing:
+                        embeddings[i] = db.get(keys[i])
+            except Exception as e:
+                logger.warning(f"No se pudo leer la cache de embeddings: {e}")
+            
+            missing = [i for i in missing if embeddings[i] is None]
+        
+        # Un solo cálculo por clave (chunks idénticos dentro del lote)
+        to_compute: Dict[str, int] = {}
+        for i in missing:
+            to_compute.setdefault(keys[i], i)
+        
+        logger.info(
+            f"Cache de embeddings: {len(texts) - len(missing)}/{len(texts)} aciertos, "
+            f"{len(to_compute)} textos a calcular"
+        )
+        
+        if to_compute:
+            new_embeddings = self._generate(
+                [texts[i] for i in to_compute.values()], show_progress, sort_by_length
+            )
+            computed = dict(zip(to_compute, new_embeddings))
+            for i in missing:
+                embeddings[i] = computed[keys[i]]
+            
+            if self.cache_path:
+                try:
+                    with shelve.open(self.cache_path) as db:
+                        for key, embedding in computed.items():
+                            db[key] = embedding
+                except Exception as e:
+                    logger.warning(f"No se pudo guardar la cache de embeddings: {e}")
+        
+        for key, embedding in zip(keys, embeddings):
+            self._remember(key, embedding)
+        
+        return embeddings
+    
+    def _generate(
+        self,
+        texts: List[str],
+        show_progress: bool,
+        sort_by_length: bool
+    ) -> List[List[float]]:
+        """Genera embeddings con el modelo, en batches"""
         logger.info(f"Generando embeddings para {len(texts)} textos")
         
+        # Orden de proceso (por longitud si se pide) para no rellenar
+        # cada batch hasta el texto más largo del lote original
+        order = list(range(len(texts)))
+        if sort_by_length:
+            order.sort(key=lambda idx: len(texts[idx]))
+        
         try:
-            # Generar en batches si es necesario
-            embeddings = []
+            # Cada resultado se escribe en su posición original
+            embeddings: List[Optional[List[float]]] = [None] * len(texts)
+            progress = 0
             
-            for i in range(0, len(texts), self.batch_size):
-                batch = texts[i:i + self.batch_size]
-                batch_embeddings = self.embed_model.get_text_embedding_batch(batch)
-                embeddings.extend(batch_embeddings)
+            # Hasta max_in_flight peticiones HTTP en curso a la vez; con
+            # modelos locales (max_in_flight=1) los batches van en serie
+            with ThreadPoolExecutor(max_workers=self.max_in_flight) as executor:
+                in_flight = deque()
+                
+                for batch in self._iter_batches(texts, order):
+                    future = executor.submit(
+                        self.embed_model.get_text_embedding_batch,
+                        [texts[idx] for idx in batch]
+                    )
+                    in_flight.append((batch, future))
+                    
+                    if len(in_flight) >= self.max_in_flight:
+                        progress = self._collect_batch(
+                            in_flight.popleft(), embeddings, progress, show_progress
+                        )
                 
-                if show_progress:
-                    progress = min(i + self.batch_size, len(texts))
-                    logger.info(f"Progreso: {progress}/{len(texts)} embeddings generados")
+                while in_flight:
+                    progress = self._collect_batch(
+                        in_flight.popleft(), embeddings, progress, show_progress
+                    )
             
             logger.info(f"Embeddings generados: {len(embeddings)} vectores")
             
@@ -203,6 +368,53 @@ class EmbeddingGenerator:
             logger.error(f"Error generando embeddings: {e}")
             raise
     
+    def _iter_batches(self, texts: List[str], order: List[int]) -> Iterator[List[int]]:
+        """
+        Agrupa los índices (en el orden dado) en batches: batch_size textos,
+        o max_batch_chars caracteres como máximo si está definido
+        """
+        batch = []
+        batch_chars = 0
+        
+        for idx in order:
+            text_chars = len(texts[idx])
+            
+            if batch:
+                if self.max_batch_chars:
+                    full = batch_chars + text_chars > self.max_batch_chars
+                else:
+                    full = len(batch) >= self.batch_size
+                
+                if full:
+                    yield batch
+                    batch = []
+                    batch_chars = 0
+            
+            batch.append(idx)
+            batch_chars += text_chars
+        
+        if batch:
+            yield batch
+    
+    def _collect_batch(
+        self,
+        pending: tuple,
+        embeddings: List[Optional[List[float]]],
+        progress: int,
+        show_progress: bool
+    ) -> int:
+        """Espera un batch en curso y coloca sus embeddings; devuelve el progreso"""
+        batch, future = pending
+        
+        for idx, embedding in zip(batch, future.result()):
+            embeddings[idx] = embedding
+        
+        progress += len(batch)
+        if show_progress:
+            logger.info(f"Progreso: {progress}/{len(embeddings)} embeddings generados")
+        
+        return progress
+    
     def generate_query_embedding(self, query: str) -> List[float]:
         """
         Genera embedding para una query
@@ -218,7 +430,8 @@ class EmbeddingGenerator:
     def embed_nodes(
         self,
         nodes: List[BaseNode],
-        show_progress: bool = True
+        show_progress: bool = True,
+        sort_by_length: bool = False
     ) -> List[BaseNode]:
         """
         Añade embeddings a los nodos
@@ -226,6 +439,7 @@ class EmbeddingGenerator:
         Args:
             nodes: Lista de nodos
             show_progress: Mostrar progreso
+            sort_by_length: Agrupar textos de longitud similar en cada batch
             
         Returns:
             Nodos con embeddings
@@ -240,7 +454,9 @@ class EmbeddingGenerator:
         texts = [node.get_content() for node in nodes]
         
         # Generar embeddings
-        embeddings = self.generate_embeddings(texts, show_progress)
+        embeddings = self.generate_embeddings(
+            texts, show_progress, sort_by_length=sort_by_length
+        )
         
         # Asignar embeddings a nodos
         for node, embedding in zip(nodes, embeddings):
@@ -263,7 +479,9 @@ class EmbeddingGenerator:
         return {
             'name': self.model_name,
             **self.model_info,
-            'batch_size': self.batch_size
+            'batch_size': self.batch_size,
+            'max_batch_chars': self.max_batch_chars,
+            'max_in_flight': self.max_in_flight
         }
     
     @property
@@ -385,6 +385,8 @@ def build_complete_pipeline(
     chunking_strategy: str = 'sentence',
     embedding_model: str = 'openai-small',
     vector_store_backend: str = 'qdrant',
+    embedder=None,
+    embedding_cache_path: Optional[str] = None,
     **kwargs
 ):
     """
@@ -395,6 +397,8 @@ def build_complete_pipeline(
         chunking_strategy: Estrategia de chunking
         embedding_model: Modelo de embeddings
         vector_store_backend: Backend del vector store
+        embedder: EmbeddingGenerator ya inicializado (evita recargar el modelo)
+        embedding_cache_path: Cache en disco de embeddings (si no se pasa embedder)
         **kwargs: Parámetros adicionales
         
     Returns:
@@ -411,7 +415,11 @@ def build_complete_pipeline(
     nodes = chunker.chunk_documents(documents)
     
     # 2. Embeddings
-    embedder = EmbeddingGenerator(model_name=embedding_model)
+    if embedder is None:
+        embedder = EmbeddingGenerator(
+            model_name=embedding_model,
+            cache_path=embedding_cache_path
+        )
     nodes = embedder.embed_nodes(nodes)
     
     # 3. Vector Store
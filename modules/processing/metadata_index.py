@@ -119,7 +119,27 @@ class MetadataIndex:
         if not filters:
             return list(self.node_metadata.keys())
         
-        logger.debug(f"Buscando con filtros: {filters} (match_all={match_all})")
+        return list(self.match_set(filters, match_all))
+    
+    def match_set(
+        self,
+        filters: Dict[str, Any],
+        match_all: bool = True
+    ) -> Set[str]:
+        """
+        Igual que search, pero retorna un set nuevo (membresía O(1))
+        
+        Args:
+            filters: Diccionario de filtros {campo: valor}
+            match_all: Si True, deben cumplir todos los filtros
+            
+        Returns:
+            Set de node_ids que cumplen los filtros
+        """
+        if not filters:
+            return set(self.node_metadata)
+        
+        logger.debug("Buscando con filtros: %s (match_all=%s)", filters, match_all)
         
         result_sets = []
         
@@ -136,21 +156,18 @@ class MetadataIndex:
             else:
                 result_sets.append(set())
         
-        # Combinar resultados
+        # Combinar resultados (sin modificar los sets del índice)
         if match_all:
-            # Intersección (AND)
-            result = result_sets[0] if result_sets else set()
-            for s in result_sets[1:]:
-                result &= s
+            # Intersección (AND), empezando por la lista más corta
+            result_sets.sort(key=len)
+            result = result_sets[0].intersection(*result_sets[1:])
         else:
             # Unión (OR)
-            result = set()
-            for s in result_sets:
-                result |= s
+            result = set().union(*result_sets)
         
-        logger.debug(f"Encontrados {len(result)} nodos")
+        logger.debug("Encontrados %d nodos", len(result))
         
-        return list(result)
+        return result
     
     def range_search(
         self,
@@ -438,9 +455,9 @@ def hybrid_search(
         return vector_results
     
     # Buscar por metadata
-    metadata_results = metadata_index.search(metadata_filters, match_all=True)
+    metadata_results = metadata_index.match_set(metadata_filters, match_all=True)
     
-    # Intersección: nodos que cumplen ambos criterios
+    # Intersección: nodos que cumplen ambos criterios (mantiene el orden vectorial)
     hybrid_results = [
         node_id for node_id in vector_results
         if node_id in metadata_results
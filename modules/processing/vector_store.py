@@ -6,6 +6,7 @@ Gestión de bases de datos vectoriales con múltiples backends
 
 from typing import List, Optional, Dict, Any, Tuple
 from pathlib import Path
+import os
 from llama_index.core.schema import BaseNode, TextNode
 from llama_index.core.vector_stores import (
     VectorStoreQuery,
@@ -48,6 +49,18 @@ class VectorStoreManager:
             'local': True,
             'cloud': False,
             'persistent': False
+        },
+        'faiss-ivfpq': {
+            'description': 'FAISS IVF+PQ - Colecciones grandes (>10k), requiere entrenamiento',
+            'local': True,
+            'cloud': False,
+            'persistent': False
+        },
+        'faiss-sq8': {
+            'description': 'FAISS int8 (1 byte/dimensión, 4x menos que float32), requiere entrenamiento',
+            'local': True,
+            'cloud': False,
+            'persistent': False
         }
     }
     
@@ -107,6 +120,12 @@ class VectorStoreManager:
         elif self.backend == 'faiss':
             return self._init_faiss(**kwargs)
         
+        elif self.backend == 'faiss-ivfpq':
+            return self._init_faiss_ivfpq(**kwargs)
+        
+        elif self.backend == 'faiss-sq8':
+            return self._init_faiss_sq8(**kwargs)
+        
         else:
             raise ValueError(f"Backend no implementado: {self.backend}")
     
@@ -153,6 +172,7 @@ class VectorStoreManager:
             collection = client.get_or_create_collection(
                 name=self.collection_name
             )
+            self._chroma_collection = collection
             
             return ChromaVectorStore(
                 chroma_collection=collection
@@ -202,6 +222,128 @@ class VectorStoreManager:
                 "FAISS no instalado. Ejecuta: pip install faiss-cpu"
             )
     
+    def _init_faiss_ivfpq(self, **kwargs):
+        """
+        Prepara FAISS con índice IVF+PQ (cuantización de producto)
+        
+        El índice se crea en train_index, cuando se conoce N (nlist =
+        min(nlist, N // 40)); hasta entonces vector_store es None. Con
+        pocos vectores es mejor 'faiss' o 'chroma'.
+        """
+        try:
+            import faiss
+        except ImportError:
+            raise ImportError(
+                "FAISS no instalado. Ejecuta: pip install faiss-cpu"
+            )
+        
+        m = kwargs.get('m')
+        if m is None:
+            # Subcuantizadores: 48 si divide la dimensión, si no el mayor divisor disponible
+            m = next(c for c in (48, 64, 32, 16, 8, 4, 2, 1) if self.dimension % c == 0)
+        elif self.dimension % m:
+            raise ValueError(
+                f"m={m} debe dividir la dimensión ({self.dimension})"
+            )
+        
+        faiss.omp_set_num_threads(os.cpu_count() or 1)
+        
+        self._ivfpq_params = {
+            'nlist': kwargs.get('nlist', 4096),
+            'm': m,
+            'nbits': kwargs.get('nbits', 8),
+            'nprobe': kwargs.get('nprobe', 16)
+        }
+        self._faiss_index = None
+        
+        return None
+    
+    def _build_faiss_ivfpq(self, n_vectors: int):
+        """Crea el índice IVF+PQ dimensionado para n_vectors vectores de entrenamiento"""
+        from llama_index.vector_stores.faiss import FaissVectorStore
+        import faiss
+        
+        params = self._ivfpq_params
+        min_vectors = 2 ** params['nbits']
+        if n_vectors < min_vectors:
+            raise ValueError(
+                f"faiss-ivfpq necesita al menos {min_vectors} vectores para "
+                f"entrenar (hay {n_vectors}); usa 'faiss' o 'chroma'"
+            )
+        
+        # ~40 vectores de entrenamiento por lista como mínimo
+        nlist = max(1, min(params['nlist'], n_vectors // 40))
+        
+        quantizer = faiss.IndexFlatL2(self.dimension)
+        faiss_index = faiss.IndexIVFPQ(
+            quantizer, self.dimension, nlist, params['m'], params['nbits']
+        )
+        faiss_index.nprobe = min(params['nprobe'], nlist)
+        
+        logger.info(f"Índice IVF+PQ: nlist={nlist}, m={params['m']}, nbits={params['nbits']}")
+        
+        self._quantizer = quantizer  # FAISS no mantiene viva la referencia en Python
+        self._faiss_index = faiss_index
+        self.vector_store = FaissVectorStore(faiss_index=faiss_index)
+    
+    def _init_faiss_sq8(self, **kwargs):
+        """
+        Inicializa FAISS con cuantización escalar a 8 bits
+        
+        Cada dimensión se guarda en un byte, con el rango (mín/máx) aprendido
+        en train_index; las distancias se calculan sobre los códigos sin
+        reconstruir los vectores en float32.
+        """
+        try:
+            from llama_index.vector_stores.faiss import FaissVectorStore
+            import faiss
+            
+            faiss.omp_set_num_threads(os.cpu_count() or 1)
+            
+            faiss_index = faiss.IndexScalarQuantizer(
+                self.dimension, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_L2
+            )
+            self._faiss_index = faiss_index
+            
+            return FaissVectorStore(faiss_index=faiss_index)
+            
+        except ImportError:
+            raise ImportError(
+                "FAISS no instalado. Ejecuta: pip install faiss-cpu"
+            )
+    
+    def train_index(self, embeddings) -> bool:
+        """
+        Entrena el índice si el backend lo necesita (faiss-ivfpq, faiss-sq8)
+        
+        Args:
+            embeddings: Matriz (N, D) de muestra (faiss-ivfpq: N >= 256)
+            
+        Returns:
+            True si el índice queda entrenado
+            
+        Raises:
+            ValueError: Si no hay suficientes vectores para entrenar
+        """
+        faiss_index = getattr(self, '_faiss_index', None)
+        needs_build = self.backend == 'faiss-ivfpq' and faiss_index is None
+        
+        if not needs_build and (faiss_index is None or faiss_index.is_trained):
+            return True
+        
+        import numpy as np
+        
+        matrix = np.ascontiguousarray(embeddings, dtype=np.float32)
+        
+        if needs_build:
+            self._build_faiss_ivfpq(len(matrix))
+            faiss_index = self._faiss_index
+        
+        logger.info(f"Entrenando índice {self.backend} con {len(matrix)} vectores")
+        faiss_index.train(matrix)
+        
+        return faiss_index.is_trained
+    
     def add_nodes(
         self,
         nodes: List[BaseNode],
@@ -234,6 +376,8 @@ class VectorStoreManager:
         logger.info(f"Añadiendo {len(nodes)} nodos al vector store")
         
         try:
+            if self.backend in ('faiss-ivfpq', 'faiss-sq8'):
+                self.train_index([n.embedding for n in nodes])
             self.vector_store.add(nodes)
             
             logger.info(f"Nodos añadidos correctamente: {len(nodes)}")
@@ -252,6 +396,71 @@ class VectorStoreManager:
                 'error': str(e)
             }
     
+    def add_nodes_bulk(
+        self,
+        ids: List[str],
+        embeddings,
+        metadatas: List[Dict[str, Any]],
+        texts: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        Añade vectores en bloque a partir de listas alineadas
+        
+        En ChromaDB se hace un único upsert (una sola transacción); en el
+        resto de backends se construyen los nodos y se usa add_nodes.
+        
+        Args:
+            ids: IDs de los vectores
+            embeddings: Matriz (N, D) o lista de vectores
+            metadatas: Metadata de cada vector
+            texts: Texto de cada vector (opcional)
+            
+        Returns:
+            Diccionario con resultados
+        """
+        if hasattr(embeddings, 'tolist'):
+            embeddings = embeddings.tolist()
+        
+        if not (len(ids) == len(embeddings) == len(metadatas)):
+            raise ValueError("ids, embeddings y metadatas deben tener la misma longitud")
+        
+        if texts is None:
+            texts = [''] * len(ids)
+        
+        collection = getattr(self, '_chroma_collection', None)
+        if collection is None:
+            self.train_index(embeddings)
+            nodes = [
+                TextNode(id_=node_id, text=text, metadata=metadata, embedding=embedding)
+                for node_id, text, metadata, embedding
+                in zip(ids, texts, metadatas, embeddings)
+            ]
+            return self.add_nodes(nodes, show_progress=False)
+        
+        logger.info(f"Añadiendo {len(ids)} vectores en bloque")
+        
+        try:
+            collection.upsert(
+                ids=list(ids),
+                embeddings=embeddings,
+                metadatas=metadatas,
+                documents=texts
+            )
+            
+            return {
+                'added': len(ids),
+                'errors': 0,
+                'collection': self.collection_name
+            }
+            
+        except Exception as e:
+            logger.error(f"Error añadiendo vectores: {e}")
+            return {
+                'added': 0,
+                'errors': len(ids),
+                'error': str(e)
+            }
+    
     def query(
         self,
         query_embedding: List[float],